@@ -8,7 +8,7 @@ import sys
 import os
 from pathlib import Path
 import json
-import subprocess
+import socket
 from datetime import datetime
 
 
@@ -118,21 +118,14 @@ def test_hardware_connection(ip_address="192.168.1.10"):
     """Test connection to ANTSDR hardware"""
     print(f"\nTesting connection to {ip_address}...")
     
-    # Test ping
+    # Test IIO daemon (iiod) port; also confirms the SDR service, not just the link, is up
     try:
-        result = subprocess.run(
-            ['ping', '-c', '3', ip_address],
-            capture_output=True,
-            timeout=5
-        )
-        if result.returncode == 0:
-            print(f"✓ Hardware reachable at {ip_address}")
-            return True
-        else:
-            print(f"⚠️  Hardware not reachable at {ip_address}")
-            return False
-    except (subprocess.TimeoutExpired, FileNotFoundError):
-        print(f"⚠️  Could not test hardware connection")
+        conn = socket.create_connection((ip_address, 30431), timeout=1.0)
+        conn.close()
+        print(f"✓ Hardware reachable at {ip_address}")
+        return True
+    except (OSError, socket.timeout):
+        print(f"⚠️  Hardware not reachable at {ip_address}")
         return False
 
 
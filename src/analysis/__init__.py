@@ -2,7 +2,7 @@
 Data analysis and processing modules for GPR system.
 """
 
-from .process_ascan import GPRDataProcessor, GPRProcessingParams
+from .process_ascan import GPRDataProcessor, GPRProcessingParams, GPRSurveyFile
 
-__all__ = ['GPRDataProcessor', 'GPRProcessingParams']
+__all__ = ['GPRDataProcessor', 'GPRProcessingParams', 'GPRSurveyFile']
 
@@ -3,15 +3,32 @@ GPR Data Analysis Module
 Processes raw IQ data into A-scans and B-scans for ground penetrating radar
 """
 
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import h5py
 from scipy import signal
-from scipy.fft import fft, ifft, fftfreq
+from scipy.fft import fft, ifft, fftfreq, rfft, irfft, set_backend
 from dataclasses import dataclass
-from typing import Tuple, List, Optional, Dict
-import matplotlib.pyplot as plt
+from typing import Tuple, List, Optional, Dict, Iterator, Union
 from datetime import datetime
 
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None  # Optional: fused kernels fall back to the NumPy path
+
+try:
+    import pyfftw
+    import pyfftw.interfaces.scipy_fft
+    
+    # Reuse FFTW plans across calls with the same trace length
+    pyfftw.interfaces.cache.enable()
+    pyfftw.interfaces.cache.set_keepalive_time(60)
+    _FFT_BACKEND = pyfftw.interfaces.scipy_fft
+except ImportError:
+    _FFT_BACKEND = 'scipy'  # Optional: pocketfft is used when pyFFTW is missing
+
 
 @dataclass
 class GPRProcessingParams:
@@ -24,6 +41,349 @@ class GPRProcessingParams:
     apply_agc: bool = True
     agc_window: int = 50  # samples
     envelope_detection: bool = True
+    plot: bool = False  # save A-scan/B-scan plots in scripts
+    plot_dpi: int = 72  # resolution of saved plots
+
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _agc_numba(data: np.ndarray, window: int) -> np.ndarray:
+        """
+        Running-RMS AGC, one trace per parallel iteration.
+        
+        Equivalent to the cumulative-sum path in apply_agc but tracks each
+        trace's RMS window with a single rolling accumulator instead of
+        materializing squared and cumulative arrays.
+        
+        Args:
+            data: Input data (n_traces, n_samples)
+            window: AGC window length (samples)
+            
+        Returns:
+            AGC-corrected data (n_traces, n_samples), same dtype as data
+        """
+        n_traces, n_samples = data.shape
+        half_lo = window // 2
+        half_hi = (window - 1) // 2
+        out = np.empty_like(data)
+        
+        for i in prange(n_traces):
+            # Window covers [j - half_lo, j + half_hi], clipped to the trace
+            acc = 0.0
+            for j in range(min(half_hi, n_samples)):
+                acc += data[i, j] * data[i, j]
+            
+            for j in range(n_samples):
+                hi = j + half_hi
+                if hi < n_samples:
+                    acc += data[i, hi] * data[i, hi]
+                lo = j - half_lo - 1
+                if lo >= 0:
+                    acc -= data[i, lo] * data[i, lo]
+                
+                rms = np.sqrt(max(acc / window, 0.0))
+                out[i, j] = data[i, j] / max(rms, 1e-6)
+        
+        return out
+    
+    @njit(parallel=True, cache=True)
+    def _dc_sosfilt_numba(data: np.ndarray, sos: np.ndarray) -> np.ndarray:
+        """
+        Fused DC removal and cascaded biquad filtering, one trace per parallel iteration.
+        
+        Equivalent to signal.sosfilt(sos, data - mean, axis=-1) with zero
+        initial state: each sample is de-meaned and passed through all
+        sections (transposed direct form II) before the next one is read.
+        
+        Args:
+            data: Input data (n_traces, n_samples)
+            sos: Second-order sections (n_sections, 6)
+            
+        Returns:
+            Filtered data (n_traces, n_samples), same dtype as data
+        """
+        n_traces, n_samples = data.shape
+        n_sections = sos.shape[0]
+        out = np.empty((n_traces, n_samples), data.dtype)
+        
+        for i in prange(n_traces):
+            mean = 0.0
+            for j in range(n_samples):
+                mean += data[i, j]
+            mean /= n_samples
+            
+            state = np.zeros((n_sections, 2))
+            for j in range(n_samples):
+                x = data[i, j] - mean
+                for k in range(n_sections):
+                    y = sos[k, 0] * x + state[k, 0]
+                    state[k, 0] = sos[k, 1] * x - sos[k, 4] * y + state[k, 1]
+                    state[k, 1] = sos[k, 2] * x - sos[k, 5] * y
+                    x = y
+                out[i, j] = x
+        
+        return out
+    
+    @njit(cache=True, nogil=True)
+    def _local_maxima_numba(x: np.ndarray, min_height: float) -> np.ndarray:
+        """
+        Local maxima at least min_height high, as found by signal.find_peaks.
+        
+        Flat tops report their midpoint. Runs in one linear pass.
+        
+        Args:
+            x: Input trace
+            min_height: Minimum peak height
+            
+        Returns:
+            Indices of candidate peaks in ascending order
+        """
+        n = x.shape[0]
+        peaks = np.empty(n // 2 + 1, dtype=np.int64)
+        n_peaks = 0
+        
+        i = 1
+        while i < n - 1:
+            if x[i - 1] < x[i]:
+                i_ahead = i + 1
+                while i_ahead < n - 1 and x[i_ahead] == x[i]:
+                    i_ahead += 1
+                if x[i_ahead] < x[i]:
+                    peak = (i + i_ahead - 1) // 2
+                    if x[peak] >= min_height:
+                        peaks[n_peaks] = peak
+                        n_peaks += 1
+                    i = i_ahead
+            i += 1
+        
+        return peaks[:n_peaks]
+    
+    @njit(cache=True, nogil=True)
+    def _select_by_distance_numba(peaks: np.ndarray, order: np.ndarray, min_distance: int) -> np.ndarray:
+        """
+        Keep the highest peaks first, discarding lower peaks closer than min_distance.
+        
+        Args:
+            peaks: Candidate peak indices in ascending order
+            order: Argsort of the candidate peak heights
+            min_distance: Minimum separation between peaks (samples, >= 1)
+            
+        Returns:
+            Indices of retained peaks in ascending order
+        """
+        n_peaks = peaks.shape[0]
+        keep = np.ones(n_peaks, dtype=np.bool_)
+        
+        for r in range(n_peaks - 1, -1, -1):
+            j = order[r]
+            if not keep[j]:
+                continue
+            k = j - 1
+            while k >= 0 and peaks[j] - peaks[k] < min_distance:
+                keep[k] = False
+                k -= 1
+            k = j + 1
+            while k < n_peaks and peaks[k] - peaks[j] < min_distance:
+                keep[k] = False
+                k += 1
+        
+        return peaks[keep]
+    
+    def _find_peaks_fast(x: np.ndarray, min_height: float, min_distance: int) -> np.ndarray:
+        """
+        Same result as signal.find_peaks(x, height=min_height, distance=min_distance)[0].
+        
+        The height ranking uses np.argsort exactly as SciPy does, so equal-height
+        peaks are resolved the same way.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        peaks = _local_maxima_numba(x, min_height)
+        order = np.argsort(x[peaks])
+        return _select_by_distance_numba(peaks, order, min_distance)
+else:
+    _agc_numba = None
+    _dc_sosfilt_numba = None
+    _find_peaks_fast = None
+
+# Batches at least this large are filtered with FFT-based FIR convolution
+FIR_MIN_TRACES = 16
+FIR_NUM_TAPS = 257
+
+# Batches at least this large detect targets on a thread pool
+PARALLEL_MIN_TRACES = 64
+
+
+def _normalized_band(low_hz: float, high_hz: float, fs: float) -> Tuple[float, float]:
+    """
+    Normalized passband edges (fraction of Nyquist), clipped to a valid range.
+    
+    Args:
+        low_hz: Lower cutoff (Hz)
+        high_hz: Upper cutoff (Hz)
+        fs: Sample rate (Hz)
+        
+    Returns:
+        Tuple of (low, high) normalized cutoff frequencies
+    """
+    nyquist = fs / 2
+    low = low_hz / nyquist
+    high = high_hz / nyquist
+    
+    # Ensure filter parameters are valid
+    low = max(0.01, min(low, 0.99))
+    high = max(low + 0.01, min(high, 0.99))
+    
+    return low, high
+
+
+def _working_dtype(data: np.ndarray) -> type:
+    """
+    Floating-point type used to process data.
+    
+    float32 input stays float32 end-to-end (halving memory traffic); any
+    other input is processed in float64.
+    """
+    return np.float32 if data.dtype == np.float32 else np.float64
+
+
+def _hilbert_quadrature(data: np.ndarray) -> np.ndarray:
+    """
+    Hilbert transform (imaginary part of the analytic signal) along the last axis.
+    
+    Uses a real FFT so float32 input stays float32 instead of being promoted
+    to complex128 as with signal.hilbert.
+    
+    Args:
+        data: Real input data
+        
+    Returns:
+        Quadrature component with the same shape and precision as data
+    """
+    n_samples = data.shape[-1]
+    
+    with set_backend(_FFT_BACKEND):
+        spectrum = rfft(data, axis=-1, workers=-1)
+        
+        # Rotate positive frequencies by -90 degrees; DC and Nyquist carry no quadrature
+        spectrum *= -1j
+        spectrum[..., 0] = 0
+        if n_samples % 2 == 0:
+            spectrum[..., -1] = 0
+        
+        return irfft(spectrum, n=n_samples, axis=-1, workers=-1)
+
+
+@functools.lru_cache(maxsize=16)
+def _design_bandpass(order: int, low_hz: float, high_hz: float, fs: float,
+                     dtype: type = np.float64) -> np.ndarray:
+    """
+    Design (and memoize) a Butterworth bandpass filter as second-order sections.
+    
+    The returned array is shared between callers and must not be modified.
+    """
+    low, high = _normalized_band(low_hz, high_hz, fs)
+    return signal.butter(order, [low, high], btype='band', output='sos').astype(dtype)
+
+
+@functools.lru_cache(maxsize=16)
+def _design_bandpass_fir(num_taps: int, low_hz: float, high_hz: float, fs: float,
+                         dtype: type = np.float64) -> np.ndarray:
+    """
+    Design (and memoize) a linear-phase FIR bandpass filter.
+    
+    The returned array is shared between callers and must not be modified.
+    """
+    low, high = _normalized_band(low_hz, high_hz, fs)
+    return signal.firwin(num_taps, [low, high], pass_zero=False).astype(dtype)
+
+
+@functools.lru_cache(maxsize=16)
+def _fir_dc_response(num_taps: int, low_hz: float, high_hz: float, fs: float,
+                     n_samples: int, dtype: type = np.float64) -> np.ndarray:
+    """
+    Response of the FIR bandpass filter ('same' mode) to a constant unit trace.
+    
+    The returned array is shared between callers and must not be modified.
+    """
+    taps = _design_bandpass_fir(num_taps, low_hz, high_hz, fs)
+    return signal.oaconvolve(np.ones(n_samples), taps, mode='same').astype(dtype)
+
+
+def _read_metadata(f: h5py.File) -> Dict:
+    """
+    Read survey metadata attributes from an open HDF5 file.
+    
+    Args:
+        f: Open HDF5 file
+        
+    Returns:
+        Dictionary with metadata (empty if the file has no metadata group)
+    """
+    metadata = {}
+    
+    if 'metadata' in f:
+        meta = f['metadata']
+        metadata['sample_rate'] = meta.attrs.get('sample_rate', 10e6)
+        metadata['center_freq'] = meta.attrs.get('center_freq', 450e6)
+        metadata['freq_start'] = meta.attrs.get('freq_start', 400e6)
+        metadata['freq_stop'] = meta.attrs.get('freq_stop', 500e6)
+        metadata['num_steps'] = meta.attrs.get('num_steps', 50)
+        metadata['timestamp'] = meta.attrs.get('timestamp', 'unknown')
+    
+    return metadata
+
+
+class GPRSurveyFile:
+    """
+    Lazily loaded GPR survey backed by an open HDF5 file.
+    Datasets stay on disk and A-scans are read in chunks on demand.
+    """
+    
+    def __init__(self, filepath: str):
+        """
+        Open GPR survey file.
+        
+        Args:
+            filepath: Path to HDF5 file
+        """
+        self._file = h5py.File(filepath, 'r')
+        self.a_scans = self._file.get('processed_data/a_scans')
+        self.frequencies = self._file.get('processed_data/frequencies')
+        self.metadata = _read_metadata(self._file)
+    
+    def __enter__(self) -> 'GPRSurveyFile':
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def close(self):
+        """Close the underlying HDF5 file."""
+        self._file.close()
+    
+    def iter_traces(self, chunk: int = 1024) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Iterate over A-scans in blocks of consecutive traces.
+        
+        Each block is read directly into a preallocated float32 buffer that is
+        reused between iterations; copy it if it must outlive the iteration.
+        
+        Args:
+            chunk: Maximum number of traces per block
+            
+        Yields:
+            Tuple of (index of first trace, block of A-scans)
+        """
+        if self.a_scans is None:
+            return
+        
+        n_traces, n_samples = self.a_scans.shape
+        buf = np.empty((min(chunk, n_traces), n_samples), dtype=np.float32)
+        
+        for start in range(0, n_traces, chunk):
+            n = min(chunk, n_traces - start)
+            self.a_scans.read_direct(buf, np.s_[start:start + n], np.s_[0:n])
+            yield start, buf[:n]
 
 
 class GPRDataProcessor:
@@ -40,6 +400,33 @@ class GPRDataProcessor:
             params: Processing parameters
         """
         self.params = params or GPRProcessingParams()
+        
+        # Streaming filter state keyed by (sample_rate, filter_low, filter_high)
+        self._zi = {}
+        
+        # Reusable scratch buffers keyed by name, reallocated when shape/dtype change
+        self._scratch = {}
+    
+    def _scratch_buffer(self, name: str, shape: Tuple[int, ...], dtype) -> np.ndarray:
+        """
+        Get a named scratch buffer, allocating it on first use or resize.
+        
+        Contents are undefined; a buffer is only valid until the next call
+        asking for the same name.
+        
+        Args:
+            name: Buffer name
+            shape: Required shape
+            dtype: Required dtype
+            
+        Returns:
+            Scratch array of the given shape and dtype
+        """
+        buf = self._scratch.get(name)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.empty(shape, dtype=dtype)
+            self._scratch[name] = buf
+        return buf
     
     def load_hdf5(self, filepath: str) -> Dict:
         """
@@ -56,67 +443,175 @@ class GPRDataProcessor:
         with h5py.File(filepath, 'r') as f:
             # Load processed data
             if 'processed_data/a_scans' in f:
-                data['a_scans'] = f['processed_data/a_scans'][:]
+                data['a_scans'] = f['processed_data/a_scans'].astype(np.float32)[:]
             
             if 'processed_data/frequencies' in f:
                 data['frequencies'] = f['processed_data/frequencies'][:]
             
             # Load metadata
-            if 'metadata' in f:
-                meta = f['metadata']
-                data['sample_rate'] = meta.attrs.get('sample_rate', 10e6)
-                data['center_freq'] = meta.attrs.get('center_freq', 450e6)
-                data['freq_start'] = meta.attrs.get('freq_start', 400e6)
-                data['freq_stop'] = meta.attrs.get('freq_stop', 500e6)
-                data['num_steps'] = meta.attrs.get('num_steps', 50)
-                data['timestamp'] = meta.attrs.get('timestamp', 'unknown')
+            data.update(_read_metadata(f))
         
         return data
     
-    def remove_dc_offset(self, data: np.ndarray) -> np.ndarray:
+    def open_hdf5(self, filepath: str) -> GPRSurveyFile:
+        """
+        Open GPR data from HDF5 file without loading it into memory.
+        
+        Args:
+            filepath: Path to HDF5 file
+            
+        Returns:
+            GPRSurveyFile (use as a context manager to close the file)
+        """
+        return GPRSurveyFile(filepath)
+    
+    def remove_dc_offset(self, data: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Remove DC offset from each trace.
         
         Args:
             data: Input data array (n_traces, n_samples)
+            out: Optional array to write the result into; may be data itself
+                to remove the offset in place
             
         Returns:
-            DC-corrected data
+            DC-corrected data (out, if given)
         """
-        if data.ndim == 1:
-            return data - np.mean(data)
-        else:
-            return data - np.mean(data, axis=1, keepdims=True)
+        means = np.mean(data, axis=-1, keepdims=True)
+        return np.subtract(data, means, out=out)
     
-    def bandpass_filter(self, data: np.ndarray, sample_rate: float) -> np.ndarray:
+    def bandpass_filter(self, data: np.ndarray, sample_rate: float,
+                        stream: bool = False,
+                        use_fir: Optional[bool] = None) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
         """
         Apply bandpass filter to remove noise.
         
+        Single traces and small batches use a causal 4th-order Butterworth
+        filter. Batches of at least FIR_MIN_TRACES traces are filtered with an
+        equivalent linear-phase FIR applied by overlap-add FFT convolution,
+        which batches across traces. The two differ in phase and group delay,
+        so callers filtering one dataset in several batches should fix the
+        choice with use_fir rather than let it follow each batch's size.
+        
+        In stream mode the Butterworth filter state is kept on the processor,
+        so consecutive chunks of a continuous acquisition are filtered without
+        re-initialization transients. The state is initialized from the first
+        sample of the first chunk (see reset_filter_state).
+        
         Args:
             data: Input data
             sample_rate: Sample rate (Hz)
+            stream: Continue from the filter state left by the previous chunk
+            use_fir: Force the FIR (True) or Butterworth (False) filter for 2-D
+                data; None chooses by batch size
             
         Returns:
-            Filtered data
+            Filtered data, or tuple of (filtered data, new filter state) if stream
         """
-        nyquist = sample_rate / 2
-        low = self.params.filter_low / nyquist
-        high = self.params.filter_high / nyquist
+        if stream:
+            return self._bandpass_stream(data, sample_rate)
         
-        # Ensure filter parameters are valid
-        low = max(0.01, min(low, 0.99))
-        high = max(low + 0.01, min(high, 0.99))
+        dtype = _working_dtype(data)
         
-        # Design Butterworth bandpass filter
-        sos = signal.butter(4, [low, high], btype='band', output='sos')
+        if self._uses_fir(data, use_fir):
+            taps = _design_bandpass_fir(FIR_NUM_TAPS, self.params.filter_low,
+                                        self.params.filter_high, sample_rate, dtype)
+            with set_backend(_FFT_BACKEND):
+                return signal.oaconvolve(data, taps[np.newaxis, :], mode='same', axes=-1)
         
-        if data.ndim == 1:
-            filtered = signal.sosfilt(sos, data)
-        else:
-            filtered = np.array([signal.sosfilt(sos, trace) for trace in data])
+        sos = _design_bandpass(4, self.params.filter_low, self.params.filter_high, sample_rate, dtype)
+        
+        # Filter all traces in a single call along the sample axis
+        filtered = signal.sosfilt(sos, data, axis=-1)
         
         return filtered
     
+    def _uses_fir(self, data: np.ndarray, use_fir: Optional[bool] = None) -> bool:
+        """
+        Whether bandpass_filter applies the FIR (rather than Butterworth) filter to data.
+        
+        Args:
+            data: Input data
+            use_fir: Explicit choice, or None to choose by batch size
+            
+        Returns:
+            True for the FIR filter
+        """
+        if data.ndim != 2 or data.shape[1] < FIR_NUM_TAPS:
+            return False
+        if use_fir is None:
+            return data.shape[0] >= FIR_MIN_TRACES
+        return use_fir
+    
+    def _dc_bandpass(self, data: np.ndarray, sample_rate: float,
+                     use_fir: Optional[bool] = None) -> np.ndarray:
+        """
+        DC removal and bandpass filtering fused into a single pass over the data.
+        
+        Equivalent to bandpass_filter(remove_dc_offset(data), sample_rate, use_fir=use_fir).
+        
+        Args:
+            data: Input data
+            sample_rate: Sample rate (Hz)
+            use_fir: Filter choice, as for bandpass_filter
+            
+        Returns:
+            DC-corrected, filtered data
+        """
+        low_hz, high_hz = self.params.filter_low, self.params.filter_high
+        data = np.asarray(data, dtype=_working_dtype(data))
+        
+        if self._uses_fir(data, use_fir):
+            # The filter is linear, so each trace's mean folds into the output
+            # as a scaled copy of the filter's response to a constant trace
+            taps = _design_bandpass_fir(FIR_NUM_TAPS, low_hz, high_hz, sample_rate, data.dtype)
+            dc_response = _fir_dc_response(FIR_NUM_TAPS, low_hz, high_hz, sample_rate,
+                                           data.shape[1], data.dtype)
+            with set_backend(_FFT_BACKEND):
+                filtered = signal.oaconvolve(data, taps[np.newaxis, :], mode='same', axes=-1)
+            filtered -= np.mean(data, axis=1, keepdims=True) * dc_response
+            return filtered
+        
+        if _dc_sosfilt_numba is not None:
+            # Coefficients and filter state stay float64; only the output takes data's dtype
+            sos = _design_bandpass(4, low_hz, high_hz, sample_rate)
+            return _dc_sosfilt_numba(np.atleast_2d(data), sos).reshape(data.shape)
+        
+        # The filter output is a new array, so the DC-free copy can live in scratch
+        centered = self._scratch_buffer('dc', data.shape, np.result_type(data.dtype, np.float32))
+        return self.bandpass_filter(self.remove_dc_offset(data, out=centered), sample_rate,
+                                    use_fir=False)
+    
+    def _bandpass_stream(self, data: np.ndarray, sample_rate: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Butterworth bandpass filter continuing from the stored filter state.
+        
+        Args:
+            data: Next chunk of input data
+            sample_rate: Sample rate (Hz)
+            
+        Returns:
+            Tuple of (filtered data, new filter state)
+        """
+        key = (sample_rate, self.params.filter_low, self.params.filter_high)
+        sos = _design_bandpass(4, self.params.filter_low, self.params.filter_high, sample_rate,
+                               _working_dtype(data))
+        zi = self._zi.get(key)
+        
+        if zi is None or zi.shape[1:-1] != data.shape[:-1] or zi.dtype != sos.dtype:
+            # Steady-state initial conditions scaled to the first sample
+            zi_unit = signal.sosfilt_zi(sos).reshape((sos.shape[0],) + (1,) * (data.ndim - 1) + (2,))
+            zi = zi_unit * data[..., 0][np.newaxis, ..., np.newaxis]
+        
+        filtered, zi = signal.sosfilt(sos, data, axis=-1, zi=zi)
+        self._zi[key] = zi
+        
+        return filtered, zi
+    
+    def reset_filter_state(self):
+        """Discard streaming filter state so the next chunk starts a new stream."""
+        self._zi.clear()
+    
     def time_zero_correction(self, data: np.ndarray) -> Tuple[np.ndarray, int]:
         """
         Find and correct time-zero (direct wave arrival).
@@ -130,28 +625,77 @@ class GPRDataProcessor:
         if data.ndim == 1:
             # Find first strong peak (direct wave)
             envelope = np.abs(signal.hilbert(data))
-            threshold = 0.5 * np.max(envelope)
-            time_zero_idx = np.argmax(envelope > threshold)
         else:
             # Average across all traces
             avg_trace = np.mean(np.abs(data), axis=0)
             envelope = np.abs(signal.hilbert(avg_trace))
-            threshold = 0.5 * np.max(envelope)
-            time_zero_idx = np.argmax(envelope > threshold)
+        
+        time_zero_idx = self._time_zero_index(envelope)
+        corrected = self._shift_to_time_zero(data, time_zero_idx)
+        
+        return corrected, time_zero_idx
+    
+    def _time_zero_index(self, envelope: np.ndarray) -> int:
+        """
+        Time-zero index from the first strong peak of an envelope.
+        
+        Args:
+            envelope: Envelope of one trace, or of traces averaged together
+            
+        Returns:
+            Time-zero index (samples), including the configured offset
+        """
+        threshold = 0.5 * np.max(envelope)
+        time_zero_idx = np.argmax(envelope > threshold)
         
         # Apply offset from parameters
         offset_samples = int(self.params.time_zero_offset * 1e-9 * self.params.velocity * 3e8)
         time_zero_idx += offset_samples
         
-        # Shift data to align time-zero
-        if data.ndim == 1:
-            corrected = np.roll(data, -time_zero_idx)
-            corrected[:time_zero_idx] = 0
+        return time_zero_idx
+    
+    def _shift_to_time_zero(self, data: np.ndarray, time_zero_idx: int) -> np.ndarray:
+        """
+        Shift traces to align time-zero, zero-filling the samples shifted in.
+        
+        Args:
+            data: Input data
+            time_zero_idx: Time-zero index (samples); negative shifts right
+            
+        Returns:
+            Shifted data
+        """
+        n_samples = data.shape[-1]
+        shift = int(np.clip(time_zero_idx, -n_samples, n_samples))
+        corrected = np.empty_like(data)
+        
+        if shift >= 0:
+            corrected[..., :n_samples - shift] = data[..., shift:]
+            corrected[..., n_samples - shift:] = 0
         else:
-            corrected = np.roll(data, -time_zero_idx, axis=1)
-            corrected[:, :time_zero_idx] = 0
+            corrected[..., -shift:] = data[..., :n_samples + shift]
+            corrected[..., :-shift] = 0
         
-        return corrected, time_zero_idx
+        return corrected
+    
+    def _envelope_and_tzero(self, data: np.ndarray) -> Tuple[np.ndarray, int]:
+        """
+        Envelope of all traces and the time-zero index found from it.
+        
+        Computes the Hilbert envelope once and locates time-zero on it
+        (on the mean envelope for 2-D data), so a pipeline that keeps the
+        envelope needs no second transform.
+        
+        Args:
+            data: Input data
+            
+        Returns:
+            Tuple of (unshifted envelope, time-zero index)
+        """
+        envelope = self.envelope_detection(data)
+        avg_envelope = envelope if envelope.ndim == 1 else np.mean(envelope, axis=0)
+        
+        return envelope, self._time_zero_index(avg_envelope)
     
     def envelope_detection(self, data: np.ndarray) -> np.ndarray:
         """
@@ -163,11 +707,9 @@ class GPRDataProcessor:
         Returns:
             Envelope (amplitude)
         """
-        if data.ndim == 1:
-            analytic = signal.hilbert(data)
-            envelope = np.abs(analytic)
-        else:
-            envelope = np.array([np.abs(signal.hilbert(trace)) for trace in data])
+        # One batched real FFT/IFFT over all traces, using all available cores
+        quadrature = _hilbert_quadrature(data)
+        envelope = np.sqrt(data * data + quadrature * quadrature)
         
         return envelope
     
@@ -182,20 +724,41 @@ class GPRDataProcessor:
             AGC-corrected data
         """
         window = self.params.agc_window
+        traces = np.atleast_2d(data)
+        n_samples = traces.shape[-1]
         
-        if data.ndim == 1:
-            # Compute running RMS
-            rms = np.sqrt(np.convolve(data**2, np.ones(window)/window, mode='same'))
-            rms = np.maximum(rms, 1e-6)  # Avoid division by zero
-            agc_data = data / rms
-        else:
-            agc_data = np.zeros_like(data)
-            for i, trace in enumerate(data):
-                rms = np.sqrt(np.convolve(trace**2, np.ones(window)/window, mode='same'))
-                rms = np.maximum(rms, 1e-6)
-                agc_data[i] = trace / rms
+        if _agc_numba is not None:
+            return _agc_numba(np.asarray(traces, dtype=_working_dtype(traces)), window).reshape(data.shape)
+        
+        dtype = _working_dtype(traces)
+        shape = traces.shape
         
-        return agc_data
+        # Running mean of the squared signal from cumulative sums, equivalent to
+        # np.convolve(trace**2, np.ones(window)/window, mode='same') per trace
+        sq = self._scratch_buffer('agc_sq', shape, dtype)
+        np.multiply(traces, traces, out=sq)
+        csum = self._scratch_buffer('agc_csum', (shape[0], n_samples + 1), np.float64)
+        csum[:, 0] = 0.0
+        np.cumsum(sq, axis=-1, out=csum[:, 1:])
+        
+        idx = np.arange(n_samples)
+        upper = np.minimum(idx + (window - 1) // 2 + 1, n_samples)
+        lower = np.maximum(idx - window // 2, 0)
+        mean_sq = self._scratch_buffer('agc_mean', shape, np.float64)
+        lower_sum = self._scratch_buffer('agc_lower', shape, np.float64)
+        np.take(csum, upper, axis=1, out=mean_sq)
+        np.take(csum, lower, axis=1, out=lower_sum)
+        np.subtract(mean_sq, lower_sum, out=mean_sq)
+        mean_sq /= window
+        
+        # Compute running RMS (sums accumulate in float64, result in the working dtype)
+        np.maximum(mean_sq, 0.0, out=mean_sq)
+        rms = self._scratch_buffer('agc_rms', shape, dtype)
+        np.sqrt(mean_sq, out=rms, casting='same_kind')
+        np.maximum(rms, 1e-6, out=rms)  # Avoid division by zero
+        agc_data = np.divide(traces, rms, dtype=dtype)
+        
+        return agc_data.reshape(data.shape)
     
     def calculate_snr(self, data: np.ndarray) -> float:
         """
@@ -244,37 +807,46 @@ class GPRDataProcessor:
             trace = np.mean(data, axis=0)
         
         # Find peaks
-        peaks, properties = signal.find_peaks(
-            trace,
-            height=np.max(trace) * 0.1,  # At least 10% of max
-            distance=int(sample_rate * 0.5e-9 / self.params.velocity)  # Minimum 0.5m separation
-        )
+        min_height = np.max(trace) * 0.1  # At least 10% of max
+        min_distance = max(1, int(sample_rate * 0.5e-9 / self.params.velocity))  # Minimum 0.5m separation
         
-        targets = []
-        for i, peak_idx in enumerate(peaks):
-            # Convert time to depth
-            time_ns = peak_idx / sample_rate * 1e9
-            depth_m = (self.params.velocity * time_ns) / 2  # Two-way travel time
-            
-            # Calculate local SNR
-            window_start = max(0, peak_idx - 50)
-            window_end = min(len(trace), peak_idx + 50)
-            local_signal = trace[peak_idx]
-            local_noise = np.std(trace[window_start:window_end])
-            
-            if local_noise > 0:
-                local_snr = 20 * np.log10(local_signal / local_noise)
-            else:
-                local_snr = 100.0
-            
-            if local_snr > self.params.snr_threshold:
-                targets.append({
-                    'index': peak_idx,
-                    'time_ns': time_ns,
-                    'depth_m': depth_m,
-                    'amplitude': local_signal,
-                    'snr_db': local_snr
-                })
+        if _find_peaks_fast is not None:
+            peaks = _find_peaks_fast(trace, min_height, min_distance)
+        else:
+            peaks, properties = signal.find_peaks(trace, height=min_height, distance=min_distance)
+        
+        # Convert time to depth
+        time_ns = peaks / sample_rate * 1e9
+        depth_m = (self.params.velocity * time_ns) / 2  # Two-way travel time
+        
+        # Local noise as the std over +/-50 samples, from running sums of x and x^2
+        csum = np.concatenate(([0.0], np.cumsum(trace, dtype=np.float64)))
+        csum_sq = np.concatenate(([0.0], np.cumsum(np.square(trace, dtype=np.float64))))
+        window_start = np.maximum(peaks - 50, 0)
+        window_end = np.minimum(peaks + 50, len(trace))
+        count = window_end - window_start
+        local_mean = (csum[window_end] - csum[window_start]) / count
+        local_var = (csum_sq[window_end] - csum_sq[window_start]) / count - local_mean ** 2
+        local_noise = np.sqrt(np.maximum(local_var, 0.0))
+        
+        # Calculate local SNR
+        local_signal = trace[peaks]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            local_snr = np.where(local_noise > 0, 20 * np.log10(local_signal / local_noise), 100.0)
+        
+        keep = local_snr > self.params.snr_threshold
+        targets = [
+            {
+                'index': peak_idx,
+                'time_ns': t_ns,
+                'depth_m': d_m,
+                'amplitude': amplitude,
+                'snr_db': snr_db
+            }
+            for peak_idx, t_ns, d_m, amplitude, snr_db in zip(
+                peaks[keep], time_ns[keep], depth_m[keep], local_signal[keep], local_snr[keep]
+            )
+        ]
         
         return targets
     
@@ -290,20 +862,149 @@ class GPRDataProcessor:
             Tuple of (processed A-scan, detected targets)
         """
         # Processing pipeline
-        processed = self.remove_dc_offset(data)
-        processed = self.bandpass_filter(processed, sample_rate)
-        processed, time_zero = self.time_zero_correction(processed)
+        processed = self._process_traces(data, sample_rate)
+        
+        # Detect targets
+        targets = self.detect_targets(processed, sample_rate)
+        
+        return processed, targets
+    
+    def process_bscan(self, a_scans: np.ndarray, sample_rate: float,
+                      use_fir: Optional[bool] = None,
+                      time_zero: Optional[int] = None) -> Tuple[np.ndarray, List[List[Dict]]]:
+        """
+        Complete processing pipeline for a batch of A-scans.
+        
+        Runs each processing stage once on the whole (n_traces, n_samples)
+        array instead of calling process_ascan per trace. Time-zero is found
+        from the mean trace (unless given) and applied to all traces.
+        
+        Args:
+            a_scans: Raw A-scans (n_traces, n_samples)
+            sample_rate: Sample rate (Hz)
+            use_fir: Bandpass filter choice (see bandpass_filter); None
+                chooses by batch size
+            time_zero: Time-zero index to apply; None finds it from this batch
+            
+        Returns:
+            Tuple of (processed A-scans, detected targets per trace)
+        """
+        # Processing pipeline
+        processed = self._process_traces(a_scans, sample_rate, use_fir, time_zero)
+        
+        # Detect targets trace by trace; the NumPy/Numba work releases the GIL
+        detect = functools.partial(self.detect_targets, sample_rate=sample_rate)
+        if len(processed) >= PARALLEL_MIN_TRACES:
+            with ThreadPoolExecutor() as pool:
+                targets = list(pool.map(detect, processed))
+        else:
+            targets = [detect(trace) for trace in processed]
+        
+        return processed, targets
+    
+    def process_survey(self, survey: GPRSurveyFile, chunk: int = 1024,
+                       time_zero: Optional[int] = None) -> Iterator[Tuple[int, np.ndarray, List[List[Dict]]]]:
+        """
+        Process a lazily loaded survey block by block with process_bscan.
+        
+        The bandpass filter and time-zero are chosen once for the whole
+        survey, so the output does not depend on chunk: it equals
+        process_bscan on all traces at once. Finding time-zero takes an
+        extra filtering pass over the survey unless it is given.
+        
+        Args:
+            survey: Open survey file
+            chunk: Maximum number of traces per block
+            time_zero: Time-zero index to apply; None finds it with survey_time_zero
+            
+        Yields:
+            Tuple of (index of first trace, processed A-scans, targets per trace)
+        """
+        if survey.a_scans is None:
+            return
+        
+        sample_rate = survey.metadata.get('sample_rate', 10e6)
+        use_fir = self._uses_fir(survey.a_scans)
+        
+        if time_zero is None:
+            time_zero = self.survey_time_zero(survey, chunk)
+        
+        for start, a_scans in survey.iter_traces(chunk):
+            processed, targets = self.process_bscan(a_scans, sample_rate, use_fir, time_zero)
+            yield start, processed, targets
+    
+    def survey_time_zero(self, survey: GPRSurveyFile, chunk: int = 1024) -> int:
+        """
+        Time-zero index of a whole survey, read block by block.
+        
+        Accumulates the mean trace envelope over all blocks, which is what
+        process_bscan would locate time-zero on if given every trace at once.
+        
+        Args:
+            survey: Open survey file
+            chunk: Maximum number of traces per block
+            
+        Returns:
+            Time-zero index (samples)
+        """
+        if survey.a_scans is None:
+            return 0
+        
+        n_traces, n_samples = survey.a_scans.shape
+        sample_rate = survey.metadata.get('sample_rate', 10e6)
+        use_fir = self._uses_fir(survey.a_scans)
+        total = np.zeros(n_samples)
+        
+        for _, a_scans in survey.iter_traces(chunk):
+            filtered = self._dc_bandpass(a_scans, sample_rate, use_fir)
+            if self.params.envelope_detection:
+                total += self.envelope_detection(filtered).sum(axis=0)
+            else:
+                total += np.abs(filtered).sum(axis=0)
+        
+        envelope = total / max(n_traces, 1)
+        if not self.params.envelope_detection:
+            # As time_zero_correction: envelope of the mean rectified trace
+            envelope = np.abs(signal.hilbert(envelope))
+        
+        return self._time_zero_index(envelope)
+    
+    def _process_traces(self, data: np.ndarray, sample_rate: float,
+                        use_fir: Optional[bool] = None,
+                        time_zero: Optional[int] = None) -> np.ndarray:
+        """
+        Processing stages shared by process_ascan and process_bscan.
+        
+        With envelope detection enabled the Hilbert envelope is computed once,
+        time-zero is located on it and the envelope itself is shifted, instead
+        of transforming before and after the time-zero shift.
+        
+        Args:
+            data: Raw A-scan data
+            sample_rate: Sample rate (Hz)
+            use_fir: Bandpass filter choice (see bandpass_filter)
+            time_zero: Time-zero index to apply; None finds it from data
+            
+        Returns:
+            Processed data
+        """
+        processed = self._dc_bandpass(data, sample_rate, use_fir)
         
         if self.params.envelope_detection:
-            processed = self.envelope_detection(processed)
+            if time_zero is None:
+                envelope, time_zero = self._envelope_and_tzero(processed)
+            else:
+                envelope = self.envelope_detection(processed)
+            processed = self._shift_to_time_zero(envelope, time_zero)
+        elif time_zero is None:
+            processed, time_zero = self.time_zero_correction(processed)
+        else:
+            processed = self._shift_to_time_zero(processed, time_zero)
         
         if self.params.apply_agc:
             processed = self.apply_agc(processed)
         
-        # Detect targets
-        targets = self.detect_targets(processed, sample_rate)
-        
-        return processed, targets
+        return processed
     
     def create_bscan(self, a_scans: np.ndarray, trace_spacing: float = 0.1) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
@@ -329,6 +1030,22 @@ class GPRDataProcessor:
         
         return a_scans, distance_axis, depth_axis
     
+    def quantize_bscan(self, b_scan: np.ndarray) -> Tuple[np.ndarray, float]:
+        """
+        Quantize B-scan to int16 for compact storage and display.
+        
+        Args:
+            b_scan: B-scan data (e.g. AGC-corrected envelope)
+            
+        Returns:
+            Tuple of (int16 B-scan, scale) where b_scan ~= quantized / scale
+        """
+        peak = np.max(np.abs(b_scan)) if b_scan.size else 0.0
+        scale = 32767 / peak if peak > 0 else 1.0
+        quantized = np.rint(b_scan * scale).astype(np.int16)
+        
+        return quantized, scale
+    
     def save_segy(self, b_scan: np.ndarray, filepath: str, metadata: Dict):
         """
         Save B-scan to SEG-Y format.
@@ -353,6 +1070,8 @@ class GPRDataProcessor:
             sample_rate: Sample rate (Hz)
             targets: List of detected targets
         """
+        import matplotlib.pyplot as plt
+        
         time_ns = np.arange(len(a_scan)) / sample_rate * 1e9
         depth_m = (self.params.velocity * time_ns) / 2
         
@@ -384,19 +1103,24 @@ class GPRDataProcessor:
                 ax2.axhline(target['depth_m'], color='r', linestyle='--', alpha=0.7)
         
         plt.tight_layout()
-        plt.savefig('ascan_plot.png', dpi=150)
+        plt.savefig('ascan_plot.png', dpi=self.params.plot_dpi)
         print("✅ A-scan plot saved to ascan_plot.png")
         plt.close()
     
-    def plot_bscan(self, b_scan: np.ndarray, distance_axis: np.ndarray, depth_axis: np.ndarray):
+    def plot_bscan(self, b_scan: np.ndarray, distance_axis: np.ndarray, depth_axis: np.ndarray,
+                   scale: float = 1.0):
         """
         Plot B-scan radargram.
         
         Args:
-            b_scan: B-scan data
+            b_scan: B-scan data (float, or int16 from quantize_bscan)
             distance_axis: Distance axis (m)
             depth_axis: Depth axis (m)
+            scale: Quantization scale from quantize_bscan (1.0 for float data)
         """
+        import matplotlib.pyplot as plt
+        from matplotlib.ticker import FuncFormatter
+        
         fig, ax = plt.subplots(figsize=(12, 6))
         
         # Plot as heatmap
@@ -414,9 +1138,12 @@ class GPRDataProcessor:
         
         cbar = plt.colorbar(im, ax=ax)
         cbar.set_label('Amplitude')
+        if scale != 1.0:
+            # Label colorbar in original amplitude units
+            cbar.ax.yaxis.set_major_formatter(FuncFormatter(lambda v, _: f"{v / scale:.3g}"))
         
         plt.tight_layout()
-        plt.savefig('bscan_plot.png', dpi=150)
+        plt.savefig('bscan_plot.png', dpi=self.params.plot_dpi)
         print("✅ B-scan plot saved to bscan_plot.png")
         plt.close()
 
@@ -435,7 +1162,8 @@ def main():
         filter_high=400e6,
         snr_threshold=10.0,
         apply_agc=True,
-        envelope_detection=True
+        envelope_detection=True,
+        plot=False
     )
     processor = GPRDataProcessor(params)
     
@@ -463,7 +1191,7 @@ def main():
     
     # Add noise
     noise = np.random.normal(0, 0.1, n_samples)
-    test_data = signal_data + noise
+    test_data = (signal_data + noise).astype(np.float32)
     
     # Process
     print("\nProcessing A-scan...")
@@ -482,19 +1210,22 @@ def main():
         print(f"    SNR: {target['snr_db']:.1f} dB")
     
     # Plot
-    processor.plot_ascan(processed, sample_rate, targets)
+    if params.plot:
+        processor.plot_ascan(processed, sample_rate, targets)
     
     # Create B-scan from multiple A-scans
     print("\nCreating B-scan from 10 traces...")
     n_traces = 10
-    a_scans = np.array([test_data + np.random.normal(0, 0.05, n_samples) for _ in range(n_traces)])
+    a_scans = (test_data + np.random.normal(0, 0.05, (n_traces, n_samples))).astype(np.float32)
     
-    # Process all traces
-    processed_scans = np.array([processor.process_ascan(scan, sample_rate)[0] for scan in a_scans])
+    # Process all traces in one batch
+    processed_scans, _ = processor.process_bscan(a_scans, sample_rate)
     
     # Create B-scan
     b_scan, distance_axis, depth_axis = processor.create_bscan(processed_scans, trace_spacing=0.1)
-    processor.plot_bscan(b_scan, distance_axis, depth_axis)
+    b_scan_q, scale = processor.quantize_bscan(b_scan)
+    if params.plot:
+        processor.plot_bscan(b_scan_q, distance_axis, depth_axis, scale=scale)
     
     print("\n✅ Processing complete")
 
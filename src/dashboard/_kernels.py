@@ -0,0 +1,37 @@
+"""
+Numba kernels for the dashboard's synthetic data generation.
+Requires numba; the dashboard falls back to NumPy without it.
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, fastmath=True)
+def build_ascan(out: np.ndarray, pulse: np.ndarray, positions: np.ndarray,
+                amplitudes: np.ndarray, noise_scale: float) -> np.ndarray:
+    """
+    Turn unit-variance noise into a synthetic A-scan in place.
+
+    Args:
+        out: Buffer holding standard normal noise (n_samples,)
+        pulse: Target pulse shape
+        positions: Start sample of each target
+        amplitudes: Amplitude of each target
+        noise_scale: Noise standard deviation
+
+    Returns:
+        out, scaled and with the target pulses added
+    """
+    n_samples = out.shape[0]
+
+    for i in range(n_samples):
+        out[i] *= noise_scale
+
+    for t in range(positions.shape[0]):
+        pos = positions[t]
+        amplitude = amplitudes[t]
+        for j in range(min(pulse.shape[0], n_samples - pos)):
+            out[pos + j] += pulse[j] * amplitude
+
+    return out
@@ -8,8 +8,10 @@ import plotly.graph_objects as go
 import plotly.express as px
 import numpy as np
 import pandas as pd
+from scipy.signal import find_peaks
 from datetime import datetime
-import time
+from collections import deque
+import functools
 import sys
 import os
 from pathlib import Path
@@ -19,11 +21,18 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 try:
     from src.hardware.antsdr_control import ANTSDRController, ANTSDRConfig
-    from src.analysis.process_ascan import GPRDataProcessor, GPRProcessingParams
+    from src.analysis.process_ascan import GPRDataProcessor, GPRProcessingParams, _find_peaks_fast
 except ImportError:
     st.warning("⚠️ Could not import hardware/analysis modules. Running in demo mode.")
     ANTSDRController = None
     GPRDataProcessor = None
+    _find_peaks_fast = None
+
+# Optional: Numba kernel for synthetic A-scans
+try:
+    from src.dashboard import _kernels
+except ImportError:
+    _kernels = None
 
 
 # Page configuration
@@ -75,8 +84,12 @@ if 'a_scan_data' not in st.session_state:
     st.session_state.a_scan_data = None
 if 'b_scan_data' not in st.session_state:
     st.session_state.b_scan_data = []
+if 'bscan_ring' not in st.session_state:
+    # Rolling radargram: one new trace per acquisition tick
+    st.session_state.bscan_ring = np.zeros((50, 1000), np.float32)
+    st.session_state.bscan_idx = 0
 if 'log_messages' not in st.session_state:
-    st.session_state.log_messages = []
+    st.session_state.log_messages = deque(maxlen=50)  # Keep only last 50 messages
 if 'targets_detected' not in st.session_state:
     st.session_state.targets_detected = []
 
@@ -89,47 +102,140 @@ def add_log(message: str, level: str = "INFO"):
         'level': level,
         'message': message
     })
-    # Keep only last 50 messages
-    if len(st.session_state.log_messages) > 50:
-        st.session_state.log_messages = st.session_state.log_messages[-50:]
 
 
-def generate_synthetic_ascan(n_samples=1000):
-    """Generate synthetic A-scan data for demo"""
-    time_axis = np.linspace(0, 100, n_samples)  # nanoseconds
-    
+@st.cache_data(ttl=1)
+def _log_dataframe(n_messages: int, last_timestamp: str, last_message: str, _messages) -> pd.DataFrame:
+    """Log table, rebuilt only when the (count, last entry) signature changes"""
+    return pd.DataFrame(list(_messages))
+
+
+# Synthetic target pulse shared by every generated A-scan
+_PULSE = np.exp(-(np.arange(50, dtype=np.float32) / 10.0) ** 2).astype(np.float32)
+
+# (start sample, amplitude) of the synthetic targets
+_TARGETS = (
+    (200, 0.8),  # Target 1 at ~20 ns (1m depth)
+    (400, 0.6),  # Target 2 at ~40 ns (2m depth)
+    (700, 0.4),  # Target 3 at ~70 ns (3.5m depth)
+)
+_TARGET_POSITIONS = np.array([pos for pos, _ in _TARGETS], dtype=np.int64)
+_TARGET_AMPLITUDES = np.array([amplitude for _, amplitude in _TARGETS], dtype=np.float32)
+
+_rng = np.random.default_rng()
+
+
+@functools.lru_cache(maxsize=8)
+def _time_axis(n_samples: int) -> np.ndarray:
+    """Cached (read-only) time axis in nanoseconds"""
+    time_axis = np.linspace(0, 100, n_samples, dtype=np.float32)
+    time_axis.flags.writeable = False
+    return time_axis
+
+
+def _add_targets(signal: np.ndarray) -> np.ndarray:
+    """Add the demo target pulses to a trace in place"""
     # Simulate targets at different depths
-    signal = np.zeros(n_samples)
-    
-    # Target 1 at ~20 ns (1m depth)
-    target1_pos = 200
-    signal[target1_pos:target1_pos+50] = np.exp(-(np.arange(50)/10)**2) * 0.8
+    for pos, amplitude in _TARGETS:
+        signal[..., pos:pos+len(_PULSE)] += _PULSE * amplitude
     
-    # Target 2 at ~40 ns (2m depth)
-    target2_pos = 400
-    signal[target2_pos:target2_pos+50] = np.exp(-(np.arange(50)/10)**2) * 0.6
-    
-    # Target 3 at ~70 ns (3.5m depth)
-    target3_pos = 700
-    signal[target3_pos:target3_pos+50] = np.exp(-(np.arange(50)/10)**2) * 0.4
+    return signal
+
+
+def generate_synthetic_ascan(n_samples=1000, out=None):
+    """Generate synthetic A-scan data for demo (written into out if given)"""
+    time_axis = _time_axis(n_samples)  # nanoseconds
     
-    # Add noise
-    noise = np.random.normal(0, 0.05, n_samples)
-    signal += noise
+    # Noise first, drawn straight into the output buffer
+    signal = _rng.standard_normal(n_samples, dtype=np.float32, out=out)
+    if _kernels is not None:
+        _kernels.build_ascan(signal, _PULSE, _TARGET_POSITIONS, _TARGET_AMPLITUDES, 0.05)
+    else:
+        signal *= np.float32(0.05)
+        _add_targets(signal)
     
     return time_axis, signal
 
 
-def generate_synthetic_bscan(n_traces=50, n_samples=1000):
-    """Generate synthetic B-scan data for demo"""
-    b_scan = np.zeros((n_traces, n_samples))
-    
-    for i in range(n_traces):
-        _, a_scan = generate_synthetic_ascan(n_samples)
-        # Add some variation
-        b_scan[i] = a_scan + np.random.normal(0, 0.02, n_samples)
-    
-    return b_scan
+# Display limits: larger traces/B-scans are reduced before going to Plotly
+MAX_ASCAN_POINTS = 2000
+MAX_BSCAN_POINTS = 5000
+MAX_BSCAN_BINS = 512
+
+
+def _decimate_envelope(sig: np.ndarray, max_pts: int = MAX_ASCAN_POINTS) -> np.ndarray:
+    """Max-envelope decimation of a trace to at most max_pts points"""
+    step = -(-len(sig) // max_pts)
+    if step <= 1:
+        return sig
+    n_bins = len(sig) // step
+    return sig[:n_bins * step].reshape(-1, step).max(axis=1)
+
+
+def _bin_samples(b_scan: np.ndarray, max_bins: int = MAX_BSCAN_BINS) -> np.ndarray:
+    """Block-mean downsampling along the sample (last) axis to at most max_bins"""
+    factor = -(-b_scan.shape[-1] // max_bins)
+    if factor <= 1:
+        return b_scan
+    n_bins = b_scan.shape[-1] // factor
+    return b_scan[..., :n_bins * factor].reshape(*b_scan.shape[:-1], n_bins, factor).mean(axis=-1)
+
+
+def _detect_peaks(sig: np.ndarray, height: float = 0.3, distance: int = 50) -> np.ndarray:
+    """Peak indices, using the Numba peak search from the analysis module when available"""
+    if _find_peaks_fast is not None:
+        return _find_peaks_fast(sig, height, distance)
+    peaks, _ = find_peaks(sig, height=height, distance=distance)
+    return peaks
+
+
+@st.cache_data
+def _ascan_layout() -> dict:
+    """Layout of the A-scan (time) plot; uirevision keeps zoom across reruns"""
+    return dict(
+        xaxis=dict(title="Time (ns)"),
+        yaxis=dict(title="Amplitude"),
+        height=300,
+        margin=dict(l=0, r=0, t=30, b=0),
+        showlegend=True,
+        hovermode='x unified',
+        plot_bgcolor='#0e1117',
+        paper_bgcolor='#0e1117',
+        font=dict(color='white'),
+        uirevision='ascan'
+    )
+
+
+@st.cache_data
+def _depth_layout() -> dict:
+    """Layout of the A-scan depth plot"""
+    return dict(
+        xaxis=dict(title="Amplitude"),
+        yaxis=dict(title="Depth (m)", autorange='reversed'),
+        height=300,
+        margin=dict(l=0, r=0, t=30, b=0),
+        showlegend=False,
+        hovermode='y unified',
+        plot_bgcolor='#0e1117',
+        paper_bgcolor='#0e1117',
+        font=dict(color='white'),
+        uirevision='depth'
+    )
+
+
+@st.cache_data
+def _bscan_layout() -> dict:
+    """Layout of the B-scan heatmap"""
+    return dict(
+        xaxis=dict(title="Distance (m)"),
+        yaxis=dict(title="Depth (m)", autorange='reversed'),
+        height=650,
+        margin=dict(l=0, r=0, t=30, b=0),
+        plot_bgcolor='#0e1117',
+        paper_bgcolor='#0e1117',
+        font=dict(color='white'),
+        uirevision='bscan'
+    )
 
 
 # Header
@@ -168,6 +274,8 @@ with col1:
         add_log("Attempting to connect to hardware...", "INFO")
         # In real implementation, connect to hardware here
         st.session_state.hardware_connected = True
+        # Display buffers reused by every acquisition tick
+        st.session_state.ascan_buf = np.empty(1000, np.float32)
         add_log("✅ Hardware connected (demo mode)", "INFO")
         st.rerun()
 
@@ -194,7 +302,7 @@ with col4:
 
 if st.sidebar.button("📸 Single Scan", disabled=not st.session_state.hardware_connected, use_container_width=True):
     add_log("Capturing single scan...", "INFO")
-    time_axis, signal = generate_synthetic_ascan()
+    time_axis, signal = generate_synthetic_ascan(out=st.session_state.get('ascan_buf'))
     st.session_state.a_scan_data = (time_axis, signal)
     add_log("✅ Single scan captured", "INFO")
     st.rerun()
@@ -205,13 +313,16 @@ if st.sidebar.button("💾 Save Data", use_container_width=True):
     add_log("✅ Data saved to gpr_scan_001.h5", "INFO")
 
 # Main content area
-# Three columns layout
-col_left, col_middle, col_right = st.columns([1, 1, 1])
+# Three columns layout: status, then the live A-scan and B-scan columns
+col_left, col_live = st.columns([1, 2])
 
 # Left Column - System Status
 with col_left:
     st.subheader("📊 System Status")
     
+    # One batch of uniform draws for all simulated status values and metrics
+    r = _rng.random(9)
+    
     # Status indicators
     status_container = st.container()
     with status_container:
@@ -226,7 +337,7 @@ with col_left:
             st.markdown("⚪ **Acquisition:** <span class='status-warning'>Idle</span>", unsafe_allow_html=True)
         
         # Simulate GPS lock
-        gps_locked = np.random.random() > 0.3
+        gps_locked = r[0] > 0.3
         if gps_locked:
             st.markdown("🟢 **GPS:** <span class='status-good'>Locked</span>", unsafe_allow_html=True)
         else:
@@ -238,152 +349,144 @@ with col_left:
     st.subheader("📈 Metrics")
     
     # Simulate metrics
-    snr_value = np.random.uniform(15, 25)
-    fps_value = np.random.uniform(8, 12)
-    temp_value = np.random.uniform(40, 50)
+    snr_value = 15 + 10 * r[1]
+    fps_value = 8 + 4 * r[2]
+    temp_value = 40 + 10 * r[3]
     
     metric_col1, metric_col2 = st.columns(2)
     with metric_col1:
-        st.metric("SNR", f"{snr_value:.1f} dB", delta=f"{np.random.uniform(-1, 1):.1f} dB")
-        st.metric("Temperature", f"{temp_value:.1f} °C", delta=f"{np.random.uniform(-0.5, 0.5):.1f} °C")
+        st.metric("SNR", f"{snr_value:.1f} dB", delta=f"{2 * r[4] - 1:.1f} dB")
+        st.metric("Temperature", f"{temp_value:.1f} °C", delta=f"{r[5] - 0.5:.1f} °C")
     
     with metric_col2:
-        st.metric("Processing FPS", f"{fps_value:.1f}", delta=f"{np.random.uniform(-0.5, 0.5):.1f}")
-        st.metric("Buffer", f"{np.random.randint(70, 95)}%", delta=f"{np.random.randint(-5, 5)}%")
-
-# Middle Column - A-Scan Display
-with col_middle:
-    st.subheader("📉 A-Scan (Live)")
+        st.metric("Processing FPS", f"{fps_value:.1f}", delta=f"{r[6] - 0.5:.1f}")
+        st.metric("Buffer", f"{70 + int(25 * r[7])}%", delta=f"{int(10 * r[8]) - 5}%")
+
+# Live plots rerun on their own every 100 ms while acquiring, without
+# re-executing the rest of the script
+@st.fragment(run_every="100ms" if st.session_state.acquisition_running else None)
+def live_view():
+    """A-scan and B-scan columns, refreshed as a fragment"""
+    col_middle, col_right = st.columns([1, 1])
     
-    # Generate or use existing data
-    if st.session_state.acquisition_running or st.session_state.a_scan_data is not None:
-        if st.session_state.acquisition_running:
-            time_axis, signal = generate_synthetic_ascan()
-            st.session_state.a_scan_data = (time_axis, signal)
-        else:
-            time_axis, signal = st.session_state.a_scan_data
-        
-        # Convert to depth
-        depth_axis = (velocity * time_axis) / 2  # Two-way travel time
-        
-        # Create plot
-        fig = go.Figure()
-        
-        fig.add_trace(go.Scatter(
-            x=time_axis,
-            y=signal,
-            mode='lines',
-            name='Amplitude',
-            line=dict(color='#00ff00', width=2)
-        ))
-        
-        # Mark detected targets (simple peak detection)
-        from scipy.signal import find_peaks
-        peaks, _ = find_peaks(signal, height=0.3, distance=50)
+    # Middle Column - A-Scan Display
+    with col_middle:
+        st.subheader("📉 A-Scan (Live)")
         
-        if len(peaks) > 0:
+        # Generate or use existing data
+        if st.session_state.acquisition_running or st.session_state.a_scan_data is not None:
+            if st.session_state.acquisition_running:
+                time_axis, signal = generate_synthetic_ascan(out=st.session_state.get('ascan_buf'))
+                st.session_state.a_scan_data = (time_axis, signal)
+            else:
+                time_axis, signal = st.session_state.a_scan_data
+            
+            # Convert to depth
+            depth_axis = (velocity * time_axis) / 2  # Two-way travel time
+            
+            # Create plot
+            fig = go.Figure(layout=_ascan_layout())
+            
+            # Long traces are decimated for display; peaks use the full trace
+            step = -(-len(signal) // MAX_ASCAN_POINTS)
+            signal_disp = _decimate_envelope(signal)
+            time_disp = time_axis[::step][:len(signal_disp)]
+            depth_disp = depth_axis[::step][:len(signal_disp)]
+            
             fig.add_trace(go.Scatter(
-                x=time_axis[peaks],
-                y=signal[peaks],
-                mode='markers',
-                name='Targets',
-                marker=dict(color='red', size=10, symbol='x')
+                x=time_disp,
+                y=signal_disp,
+                mode='lines',
+                name='Amplitude',
+                line=dict(color='#00ff00', width=2)
             ))
-        
-        fig.update_layout(
-            xaxis_title="Time (ns)",
-            yaxis_title="Amplitude",
-            height=300,
-            margin=dict(l=0, r=0, t=30, b=0),
-            showlegend=True,
-            hovermode='x unified',
-            plot_bgcolor='#0e1117',
-            paper_bgcolor='#0e1117',
-            font=dict(color='white')
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-        
-        # Depth plot
-        fig2 = go.Figure()
-        
-        fig2.add_trace(go.Scatter(
-            y=depth_axis,
-            x=signal,
-            mode='lines',
-            name='Amplitude',
-            line=dict(color='#00ff00', width=2)
-        ))
-        
-        if len(peaks) > 0:
+            
+            # Mark detected targets (simple peak detection)
+            peaks = _detect_peaks(signal)
+            
+            if len(peaks) > 0:
+                fig.add_trace(go.Scatter(
+                    x=time_axis[peaks],
+                    y=signal[peaks],
+                    mode='markers',
+                    name='Targets',
+                    marker=dict(color='red', size=10, symbol='x')
+                ))
+            
+            st.plotly_chart(fig, use_container_width=True)
+            
+            # Depth plot
+            fig2 = go.Figure(layout=_depth_layout())
+            
             fig2.add_trace(go.Scatter(
-                y=depth_axis[peaks],
-                x=signal[peaks],
-                mode='markers',
-                name='Targets',
-                marker=dict(color='red', size=10, symbol='x')
+                y=depth_disp,
+                x=signal_disp,
+                mode='lines',
+                name='Amplitude',
+                line=dict(color='#00ff00', width=2)
             ))
-        
-        fig2.update_layout(
-            xaxis_title="Amplitude",
-            yaxis_title="Depth (m)",
-            height=300,
-            margin=dict(l=0, r=0, t=30, b=0),
-            yaxis=dict(autorange='reversed'),
-            showlegend=False,
-            hovermode='y unified',
-            plot_bgcolor='#0e1117',
-            paper_bgcolor='#0e1117',
-            font=dict(color='white')
-        )
-        
-        st.plotly_chart(fig2, use_container_width=True)
-        
-    else:
-        st.info("👆 Click 'Single Scan' or 'Start' to begin acquisition")
+            
+            if len(peaks) > 0:
+                fig2.add_trace(go.Scatter(
+                    y=depth_axis[peaks],
+                    x=signal[peaks],
+                    mode='markers',
+                    name='Targets',
+                    marker=dict(color='red', size=10, symbol='x')
+                ))
+            
+            st.plotly_chart(fig2, use_container_width=True)
+            
+        else:
+            st.info("👆 Click 'Single Scan' or 'Start' to begin acquisition")
 
-# Right Column - B-Scan Display
-with col_right:
-    st.subheader("🗺️ B-Scan (Radargram)")
-    
-    # Generate B-scan data
-    if st.session_state.acquisition_running:
-        b_scan_data = generate_synthetic_bscan(n_traces=50, n_samples=1000)
-        st.session_state.b_scan_data = b_scan_data
-    elif len(st.session_state.b_scan_data) > 0:
-        b_scan_data = st.session_state.b_scan_data
-    else:
-        b_scan_data = None
-    
-    if b_scan_data is not None:
-        # Create heatmap
-        distance_axis = np.arange(b_scan_data.shape[0]) * 0.1  # 0.1m spacing
-        time_axis = np.linspace(0, 100, b_scan_data.shape[1])
-        depth_axis = (velocity * time_axis) / 2
+    # Right Column - B-Scan Display
+    with col_right:
+        st.subheader("🗺️ B-Scan (Radargram)")
         
-        fig = go.Figure(data=go.Heatmap(
-            z=b_scan_data.T,
-            x=distance_axis,
-            y=depth_axis,
-            colorscale='Gray',
-            reversescale=True,
-            hovertemplate='Distance: %{x:.2f} m<br>Depth: %{y:.2f} m<br>Amplitude: %{z:.3f}<extra></extra>'
-        ))
-        
-        fig.update_layout(
-            xaxis_title="Distance (m)",
-            yaxis_title="Depth (m)",
-            height=650,
-            margin=dict(l=0, r=0, t=30, b=0),
-            yaxis=dict(autorange='reversed'),
-            plot_bgcolor='#0e1117',
-            paper_bgcolor='#0e1117',
-            font=dict(color='white')
-        )
+        # Add this tick's A-scan to the rolling B-scan
+        if st.session_state.acquisition_running:
+            ring = st.session_state.bscan_ring
+            ring[st.session_state.bscan_idx] = st.session_state.a_scan_data[1]
+            st.session_state.bscan_idx = (st.session_state.bscan_idx + 1) % len(ring)
+            
+            # Oldest trace first
+            b_scan_data = np.roll(ring, -st.session_state.bscan_idx, axis=0)
+            st.session_state.b_scan_data = b_scan_data
+        elif len(st.session_state.b_scan_data) > 0:
+            b_scan_data = st.session_state.b_scan_data
+        else:
+            b_scan_data = None
         
-        st.plotly_chart(fig, use_container_width=True)
-    else:
-        st.info("👆 Start acquisition to generate B-scan")
+        if b_scan_data is not None:
+            # Create heatmap
+            distance_axis = np.arange(b_scan_data.shape[0]) * 0.1  # 0.1m spacing
+            time_axis = np.linspace(0, 100, b_scan_data.shape[1])
+            depth_axis = (velocity * time_axis) / 2
+            
+            # Bin large B-scans along depth before sending them to the browser
+            if b_scan_data.size > MAX_BSCAN_POINTS:
+                b_scan_disp = _bin_samples(b_scan_data)
+                depth_axis = _bin_samples(depth_axis)
+            else:
+                b_scan_disp = b_scan_data
+            
+            fig = go.Figure(data=go.Heatmap(
+                z=b_scan_disp.T,
+                x=distance_axis,
+                y=depth_axis,
+                colorscale='Gray',
+                reversescale=True,
+                hovertemplate='Distance: %{x:.2f} m<br>Depth: %{y:.2f} m<br>Amplitude: %{z:.3f}<extra></extra>'
+            ), layout=_bscan_layout())
+            
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("👆 Start acquisition to generate B-scan")
+
+
+with col_live:
+    live_view()
 
 # Bottom section - Log viewer
 st.divider()
@@ -393,7 +496,9 @@ log_container = st.container()
 with log_container:
     if len(st.session_state.log_messages) > 0:
         # Create DataFrame from log messages
-        log_df = pd.DataFrame(st.session_state.log_messages)
+        last = st.session_state.log_messages[-1]
+        log_df = _log_dataframe(len(st.session_state.log_messages), last['timestamp'],
+                                last['message'], st.session_state.log_messages)
         
         # Color code by level
         def color_level(val):
@@ -413,12 +518,6 @@ with log_container:
     else:
         st.info("No log messages yet")
 
-# Auto-refresh when acquisition is running
-if st.session_state.acquisition_running:
-    time.sleep(0.1)  # 10 FPS refresh rate
-    st.rerun()
-
-
 # Footer
 st.divider()
 st.markdown("""
@@ -17,11 +17,140 @@ from gnuradio import gr, blocks, filter, fft, analog, iio
 from gnuradio.filter import firdes
 import numpy as np
 import h5py
+import functools
+import os
 import time
 from datetime import datetime
 from typing import Optional
 import pmt
 
+# Optional: Numba JIT for the frequency stepper fill
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+@functools.lru_cache(maxsize=32)
+def _lowpass_taps(sample_rate, cutoff, transition, win=fft.window.WIN_HAMMING, param=6.76):
+    """
+    Cached low-pass filter design.
+    
+    Args:
+        sample_rate: Sample rate (Hz)
+        cutoff: Cutoff frequency (Hz)
+        transition: Transition width (Hz)
+        win: Window type
+        param: Window parameter
+        
+    Returns:
+        Filter taps as a tuple
+    """
+    return tuple(firdes.low_pass(1.0, sample_rate, cutoff, transition, window=win, param=param))
+
+
+@functools.lru_cache(maxsize=8)
+def _bh_window(n):
+    """
+    Cached Blackman-Harris FFT window.
+    
+    Args:
+        n: Window length
+        
+    Returns:
+        Window coefficients as a tuple
+    """
+    return tuple(fft.window.blackmanharris(n))
+
+
+# HDF5 chunk cache hash slots (prime, ~100x the chunks the cache holds)
+CHUNK_CACHE_SLOTS = 1009
+
+
+def _open_stream_dataset(filepath, dataset, row_shape, chunk_rows, cached_chunks):
+    """
+    Open an extensible float32 dataset for streaming appends.
+    
+    The file is opened in append mode, so an existing dataset is extended
+    rather than truncated. The chunk cache holds several whole chunks, so
+    appends that fill a chunk piecewise don't read back, decompress and
+    recompress the partial chunk on every call.
+    
+    Args:
+        filepath: HDF5 file path (created if missing)
+        dataset: Dataset path inside the file
+        row_shape: Shape of one row
+        chunk_rows: Rows per chunk
+        cached_chunks: Whole chunks held in the chunk cache
+        
+    Returns:
+        Tuple of (h5py.File, h5py.Dataset)
+    """
+    chunk_bytes = chunk_rows * int(np.prod(row_shape)) * np.dtype(np.float32).itemsize
+    f = h5py.File(filepath, 'a',
+                  rdcc_nbytes=cached_chunks * chunk_bytes,
+                  rdcc_nslots=CHUNK_CACHE_SLOTS)
+    
+    if dataset in f:
+        dset = f[dataset]
+        if dset.maxshape[0] is not None or dset.shape[1:] != tuple(row_shape):
+            f.close()
+            raise ValueError(
+                f"{filepath}:{dataset} is not an extensible {tuple(row_shape)} dataset"
+            )
+        return f, dset
+    
+    dset = f.create_dataset(
+        dataset,
+        shape=(0, *row_shape),
+        maxshape=(None, *row_shape),
+        dtype=np.float32,
+        chunks=(chunk_rows, *row_shape),
+        compression='lzf',
+        shuffle=True,
+        track_times=False
+    )
+    return f, dset
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _fill_steps(out, frequencies, step, count, dwell):
+        """
+        Fill an output buffer with stepped frequencies.
+        
+        Args:
+            out: Output buffer
+            frequencies: Frequency list (Hz)
+            step: Current step index
+            count: Samples already output at the current step
+            dwell: Samples per frequency step
+            
+        Returns:
+            Tuple of (new step index, new sample count, steps entered)
+        """
+        n_samples = out.shape[0]
+        num_steps = frequencies.shape[0]
+        entered = np.empty(n_samples // dwell + 1, dtype=np.int64)
+        k = 0
+        pos = 0
+        
+        while pos < n_samples:
+            if count >= dwell:
+                step = (step + 1) % num_steps
+                entered[k] = step
+                k += 1
+                count = 0
+            
+            run = min(dwell - count, n_samples - pos)
+            out[pos:pos + run] = frequencies[step]
+            count += run
+            pos += run
+        
+        return step, count, entered[:k]
+else:
+    _fill_steps = None
+
 
 class SFCWFrequencyStepper(gr.sync_block):
     """
@@ -49,8 +178,10 @@ class SFCWFrequencyStepper(gr.sync_block):
         self.num_steps = num_steps
         self.dwell_samples = dwell_samples
         
-        # Generate frequency list
+        # Generate frequency list (float64 for control messages, plus a
+        # float32 copy matching the output stream)
         self.frequencies = np.linspace(freq_start, freq_stop, num_steps)
+        self.frequencies_f32 = self.frequencies.astype(np.float32)
         self.current_step = 0
         self.sample_count = 0
         
@@ -62,25 +193,211 @@ class SFCWFrequencyStepper(gr.sync_block):
         out = output_items[0]
         n_samples = len(out)
         
-        for i in range(n_samples):
-            if self.sample_count >= self.dwell_samples:
+        if _fill_steps is not None:
+            self.current_step, self.sample_count, entered = _fill_steps(
+                out, self.frequencies_f32, self.current_step, self.sample_count, self.dwell_samples
+            )
+            
+            # Send frequency update messages
+            for step in entered:
+                freq_msg = pmt.from_double(self.frequencies[step])
+                self.message_port_pub(pmt.intern("freq"), freq_msg)
+            
+            return n_samples
+        
+        # Fill one dwell run at a time instead of sample by sample
+        frequencies = self.frequencies
+        frequencies_f32 = self.frequencies_f32
+        dwell = self.dwell_samples
+        step = self.current_step
+        count = self.sample_count
+        
+        pos = 0
+        while pos < n_samples:
+            if count >= dwell:
                 # Time to step to next frequency
-                self.current_step = (self.current_step + 1) % self.num_steps
-                freq = self.frequencies[self.current_step]
+                step = (step + 1) % self.num_steps
+                freq = frequencies[step]
                 
                 # Send frequency update message
                 freq_msg = pmt.from_double(freq)
                 self.message_port_pub(pmt.intern("freq"), freq_msg)
                 
-                self.sample_count = 0
+                count = 0
             
-            # Output current frequency
-            out[i] = self.frequencies[self.current_step]
-            self.sample_count += 1
+            # Output current frequency for the rest of this dwell (or buffer)
+            run = min(dwell - count, n_samples - pos)
+            out[pos:pos + run] = frequencies_f32[step]
+            count += run
+            pos += run
+        
+        self.current_step = step
+        self.sample_count = count
         
         return n_samples
 
 
+class H5AScanSink(gr.sync_block):
+    """
+    Custom block streaming processed A-scans into an HDF5 dataset.
+    Appends each input vector as one row of an extensible, chunked dataset,
+    so memory use stays constant over long acquisitions. The file is opened
+    in append mode when the flowgraph starts, so neither constructing nor
+    restarting the block truncates A-scans already saved there.
+    """
+    
+    def __init__(self, filepath, n_range_bins, dataset='processed_data/a_scans'):
+        """
+        Args:
+            filepath: Output HDF5 file path (created or appended to on start)
+            n_range_bins: Range bins per A-scan (input vector length)
+            dataset: Dataset path inside the file
+        """
+        gr.sync_block.__init__(
+            self,
+            name="HDF5 A-Scan Sink",
+            in_sig=[(np.float32, n_range_bins)],
+            out_sig=None
+        )
+        
+        self.filepath = filepath
+        self.dataset = dataset
+        self.n_range_bins = n_range_bins
+        
+        # Chunks of whole A-scans, ~20 MB each
+        self.scans_per_chunk = max(1, 20_000_000 // (n_range_bins * 4))
+        
+        self.file = None
+        self.dset = None
+    
+    def start(self):
+        """
+        Open the output file when the flowgraph starts.
+        
+        New A-scans are appended after any already in the dataset, including
+        those of a run saved and closed earlier.
+        """
+        if self.file is None:
+            # Two ~20 MB chunks cached: appends never re-read a partial chunk
+            self.file, self.dset = _open_stream_dataset(
+                self.filepath, self.dataset, (self.n_range_bins,),
+                self.scans_per_chunk, cached_chunks=2
+            )
+        return True
+    
+    def work(self, input_items, output_items):
+        """Append incoming A-scans to the dataset"""
+        if self.dset is None:
+            raise RuntimeError(
+                f"H5AScanSink for {self.filepath} is closed; start the flowgraph again to record"
+            )
+        
+        scans = input_items[0]
+        n_scans = len(scans)
+        
+        self.dset.resize(self.dset.shape[0] + n_scans, axis=0)
+        self.dset[-n_scans:] = scans
+        
+        return n_scans
+    
+    def stop(self):
+        """Flush written A-scans when the flowgraph stops"""
+        if self.file is not None:
+            self.file.flush()
+        return True
+    
+    def close(self):
+        """Close the HDF5 file"""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            self.dset = None
+    
+    def data(self):
+        """
+        Read back all A-scans written so far.
+        
+        Returns:
+            A-scans array (n_scans, n_range_bins)
+        """
+        if self.file is not None:
+            return self.dset[...]
+        
+        if not os.path.exists(self.filepath):
+            return np.empty((0, self.n_range_bins), dtype=np.float32)
+        
+        with h5py.File(self.filepath, 'r') as f:
+            return f[self.dataset][...]
+
+
+class H5IQSink(gr.sync_block):
+    """
+    Custom block streaming raw complex IQ into an HDF5 dataset.
+    Samples are stored as interleaved float32 (I, Q) pairs in an
+    extensible (n_samples, 2) dataset. The file is opened in append mode
+    when the flowgraph starts, so a restart never wipes an earlier capture.
+    """
+    
+    def __init__(self, filepath, dataset='raw_iq'):
+        """
+        Args:
+            filepath: Output HDF5 file path (created or appended to on start)
+            dataset: Dataset path inside the file
+        """
+        gr.sync_block.__init__(
+            self,
+            name="HDF5 IQ Sink",
+            in_sig=[np.complex64],
+            out_sig=None
+        )
+        
+        self.filepath = filepath
+        self.dataset = dataset
+        
+        self.file = None
+        self.dset = None
+    
+    def start(self):
+        """Open the output file when the flowgraph starts, appending after any earlier capture"""
+        if self.file is None:
+            # ~2 MB chunks, eight cached: headroom well above 10 MSPS (80 MB/s)
+            self.file, self.dset = _open_stream_dataset(
+                self.filepath, self.dataset, (2,), 262144, cached_chunks=8
+            )
+        return True
+    
+    def work(self, input_items, output_items):
+        """Append incoming samples to the dataset"""
+        if self.dset is None:
+            raise RuntimeError(
+                f"H5IQSink for {self.filepath} is closed; start the flowgraph again to record"
+            )
+        
+        samples = input_items[0]
+        n_samples = len(samples)
+        
+        # Zero-copy view of complex64 as (I, Q) float32 pairs
+        iq = samples.view(np.float32).reshape(-1, 2)
+        
+        self.dset.resize(self.dset.shape[0] + n_samples, axis=0)
+        self.dset[-n_samples:] = iq
+        
+        return n_samples
+    
+    def stop(self):
+        """Flush written samples when the flowgraph stops"""
+        if self.file is not None:
+            self.file.flush()
+        return True
+    
+    def close(self):
+        """Close the HDF5 file"""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            self.dset = None
+
+
 class sfcw_gpr_450mhz(gr.top_block):
     """
     SFCW GPR Top Block
@@ -93,7 +410,7 @@ class sfcw_gpr_450mhz(gr.top_block):
         
         Args:
             use_hardware: If True, use ANTSDR E316. If False, use simulation.
-            data_file: Output HDF5 file path
+            data_file: Output HDF5 file path (A-scans are streamed into it)
         """
         gr.top_block.__init__(self, "SFCW GPR 450MHz")
         
@@ -190,21 +507,12 @@ class sfcw_gpr_450mhz(gr.top_block):
         # Complex conjugate for proper mixing
         self.conjugate = blocks.conjugate_cc()
         
-        # Low-pass filter to extract baseband
-        lpf_taps = firdes.low_pass(
-            1.0,
-            self.sample_rate,
-            self.bandwidth / 2,
-            self.bandwidth / 10,
-            window=fft.window.WIN_HAMMING,
-            param=6.76
-        )
-        self.lpf = filter.fir_filter_ccf(1, lpf_taps)
-        
-        # Decimation to reduce data rate
+        # Low-pass filter to extract baseband, evaluated only at the
+        # decimated output rate to reduce data rate
+        lpf_taps = _lowpass_taps(self.sample_rate, self.bandwidth / 2, self.bandwidth / 10)
         self.decimator = filter.fir_filter_ccf(
             10,  # Decimation factor
-            firdes.low_pass(1.0, self.sample_rate, self.bandwidth/2, self.bandwidth/10)
+            list(lpf_taps)
         )
         
         # Stream to vector for FFT processing
@@ -213,30 +521,25 @@ class sfcw_gpr_450mhz(gr.top_block):
             self.dwell_samples // 10  # After decimation
         )
         
-        # FFT for range processing
+        # FFT for range processing (one FFT per dwell, so the size stays
+        # tied to dwell_samples rather than padded to a power of two)
+        fft_threads = max(1, (os.cpu_count() or 1) // 2)
         self.fft_block = fft.fft_vcc(
             self.dwell_samples // 10,
             True,  # Forward FFT
-            window.blackmanharris(self.dwell_samples // 10),
+            list(_bh_window(self.dwell_samples // 10)),
             True,  # Shift
-            1  # Threads
+            fft_threads  # Threads
         )
         
         # Complex to magnitude
         self.complex_to_mag = blocks.complex_to_mag(self.dwell_samples // 10)
         
-        # Vector sink to capture processed data
-        self.vector_sink = blocks.vector_sink_f(self.dwell_samples // 10)
-        
         # File sinks for logging
-        self.file_sink_raw = blocks.file_sink(
-            gr.sizeof_gr_complex,
-            "gpr_raw_iq.dat",
-            False
-        )
-        self.file_sink_raw.set_unbuffered(False)
+        self.file_sink_raw = H5IQSink("gpr_raw_iq.h5")
         
-        self.file_sink_processed = blocks.vector_sink_f(self.dwell_samples // 10)
+        # Processed A-scans stream straight into the HDF5 data file
+        self.file_sink_processed = H5AScanSink(self.data_file, self.dwell_samples // 10)
         
         # Throttle for simulation mode
         if not use_hardware:
@@ -268,8 +571,7 @@ class sfcw_gpr_450mhz(gr.top_block):
         self.connect((self.conjugate, 0), (self.multiply, 1))
         
         # Filtering and decimation
-        self.connect((self.multiply, 0), (self.lpf, 0))
-        self.connect((self.lpf, 0), (self.decimator, 0))
+        self.connect((self.multiply, 0), (self.decimator, 0))
         
         # FFT processing
         self.connect((self.decimator, 0), (self.stream_to_vector, 0))
@@ -280,23 +582,19 @@ class sfcw_gpr_450mhz(gr.top_block):
         # Frequency stepping control
         self.msg_connect((self.freq_stepper, "freq"), (self.signal_source, "freq"))
     
-    def get_data(self):
+    def get_data(self, include_scans: bool = True):
         """
-        Retrieve captured data from vector sinks.
+        Retrieve captured data from the A-scan sink.
         
+        Args:
+            include_scans: If False, skip reading the A-scans back ('a_scans' is None)
+            
         Returns:
             Dictionary with raw and processed data
         """
-        processed_data = np.array(self.file_sink_processed.data())
-        
-        # Reshape into A-scans (one per frequency step)
-        n_range_bins = self.dwell_samples // 10
-        n_scans = len(processed_data) // n_range_bins
-        
-        if n_scans > 0:
-            a_scans = processed_data[:n_scans * n_range_bins].reshape((n_scans, n_range_bins))
-        else:
-            a_scans = np.array([])
+        # One A-scan per frequency step, read back already (n_scans, n_range_bins)
+        # float32 with no reshape or dtype conversion
+        a_scans = self.file_sink_processed.data() if include_scans else None
         
         return {
             'a_scans': a_scans,
@@ -309,24 +607,53 @@ class sfcw_gpr_450mhz(gr.top_block):
         """
         Save captured data to HDF5 file.
         
+        The A-scans are already streamed into the flowgraph's data file, so
+        saving there only completes it with frequencies and metadata (and
+        closes the sink); any other path gets a full copy. The raw IQ file
+        is complete once acquisition has stopped, so it is closed here too.
+        
         Args:
             filepath: Output file path (uses default if None)
         """
         if filepath is None:
             filepath = self.data_file
         
-        data = self.get_data()
+        # Saving in place needs no copy of the streamed A-scans
+        in_place = os.path.realpath(filepath) == os.path.realpath(self.data_file)
+        data = self.get_data(include_scans=not in_place)
+        
+        self.file_sink_raw.close()
+        
+        if in_place:
+            self.file_sink_processed.close()
+            f = h5py.File(filepath, 'a')
+        else:
+            f = h5py.File(filepath, 'w')
         
-        with h5py.File(filepath, 'w') as f:
+        with f:
             # Create groups
-            raw_grp = f.create_group('raw_data')
-            proc_grp = f.create_group('processed_data')
-            meta_grp = f.create_group('metadata')
+            raw_grp = f.require_group('raw_data')
+            proc_grp = f.require_group('processed_data')
+            meta_grp = f.require_group('metadata')
             
             # Save processed data
-            if len(data['a_scans']) > 0:
-                proc_grp.create_dataset('a_scans', data=data['a_scans'])
-            proc_grp.create_dataset('frequencies', data=data['frequencies'])
+            if data['a_scans'] is not None and len(data['a_scans']) > 0:
+                a_scans = data['a_scans']
+                n_scans, n_range_bins = a_scans.shape
+                
+                # Pack whole A-scans into chunks of up to ~1 MB (HDF5 chunk cache size)
+                scans_per_chunk = max(1, 1_000_000 // (n_range_bins * a_scans.itemsize))
+                proc_grp.create_dataset(
+                    'a_scans',
+                    data=a_scans,
+                    chunks=(min(scans_per_chunk, n_scans), n_range_bins),
+                    compression='lzf',
+                    shuffle=True,
+                    track_times=False
+                )
+            if 'frequencies' in proc_grp:
+                del proc_grp['frequencies']
+            proc_grp.create_dataset('frequencies', data=data['frequencies'], track_times=False)
             
             # Save metadata
             meta_grp.attrs['sample_rate'] = self.sample_rate
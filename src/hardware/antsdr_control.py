@@ -3,20 +3,84 @@ ANTSDR E316 Hardware Control Module
 Provides Python interface to configure and monitor ANTSDR E316 (AD9364) via IIO.
 """
 
+import shutil
+import socket
+import sys
 import subprocess
+import threading
 import time
 import logging
-from typing import Dict, Optional, Tuple
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from dataclasses import asdict, dataclass
 import json
+import numpy as np
+
+# Optional: faster JSON serialization
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional: native libiio bindings (one persistent context instead of iio_attr calls)
+try:
+    import iio
+except ImportError:
+    iio = None
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# iiod network port on the ANTSDR
+IIOD_PORT = 30431
+
+# AD9364 fastlock profile slots per LO
+FASTLOCK_PROFILES = 8
+
+# Attributes of the LO (altvoltage) channels rather than voltage0
+LO_ATTRS = ("frequency", "fastlock_store", "fastlock_recall")
+
+# TX synthesizer lock detect (AD9364 register 0x287, bit 1) and how long to poll it
+TX_SYNTH_LOCK_REG = 0x287
+SYNTH_LOCK_BIT = 0x02
+PLL_LOCK_TIMEOUT = 5e-3  # s
+PLL_LOCK_POLL_INTERVAL = 50e-6  # s between register reads
+
+# Concurrent IIO requests in flight (more only contend on iiod)
+IIO_MAX_WORKERS = 4
+
+
+def _json_dumps(obj) -> bytes:
+    """Serialize to indented JSON (UTF-8 bytes), using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode()
+
 
-@dataclass
+def _json_loads(data: bytes):
+    """Parse JSON, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Status report key and unit divisor for the numeric config fields
+STATUS_UNITS = {
+    "center_freq": ("center_freq_mhz", 1e6),
+    "tx_power": ("tx_power_dbm", 1),
+    "rx_gain": ("rx_gain_db", 1),
+    "sample_rate": ("sample_rate_msps", 1e6),
+    "bandwidth": ("bandwidth_mhz", 1e6),
+}
+
+
+# __slots__ dataclasses need Python 3.10; older interpreters keep a __dict__
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_SLOTS)
 class ANTSDRConfig:
-    """Configuration parameters for ANTSDR E316"""
+    """Configuration parameters for ANTSDR E316 (immutable; use dataclasses.replace)"""
     ip_address: str = "192.168.1.10"
     center_freq: float = 450e6  # Hz
     tx_power: float = -10.0  # dBm
@@ -33,6 +97,9 @@ class ANTSDRController:
     Manages RF parameters, GPS, and data streaming.
     """
     
+    # Throttles IIO requests across all controllers and threads
+    _iio_sem = threading.BoundedSemaphore(IIO_MAX_WORKERS)
+    
     def __init__(self, config: Optional[ANTSDRConfig] = None):
         """
         Initialize ANTSDR controller.
@@ -46,7 +113,24 @@ class ANTSDRController:
         self.is_connected = False
         self.gps_locked = False
         
-    def _run_iio_cmd(self, args: list, check: bool = True) -> Tuple[bool, str]:
+        # Resolve iio_attr once instead of a PATH search per command
+        self._iio_attr = shutil.which("iio_attr")
+        
+        # Constant argv parts: command prefix and per-attribute addresses
+        self._cmd_prefix = (self._iio_attr, "-u", self.device_uri)
+        self._attr_argv = {}
+        
+        # libiio context, PHY device and channel handles, opened on first use
+        # after connect() when the bindings are available
+        self._ctx = None
+        self._phy = None
+        self._channels = {}
+        self._ctx_lock = threading.Lock()
+        
+        # TX LO frequencies currently held in fastlock profiles 0..n-1
+        self._fastlock_freqs = None
+        
+    def _run_iio_cmd(self, args: List[str], check: bool = True) -> Tuple[bool, str]:
         """
         Execute IIO command and return result.
         
@@ -57,15 +141,20 @@ class ANTSDRController:
         Returns:
             Tuple of (success, output)
         """
-        cmd = ["iio_attr", "-u", self.device_uri] + args
+        if self._iio_attr is None:
+            logger.error("iio_attr command not found. Please install libiio-utils.")
+            return False, "iio_attr not found"
+        
+        cmd = [*self._cmd_prefix, *args]
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=5.0,
-                check=check
-            )
+            with self._iio_sem:
+                result = subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    text=True,
+                    timeout=5.0,
+                    check=check
+                )
             return True, result.stdout.strip()
         except subprocess.CalledProcessError as e:
             logger.error(f"IIO command failed: {' '.join(cmd)}")
@@ -78,6 +167,115 @@ class ANTSDRController:
             logger.error("iio_attr command not found. Please install libiio-utils.")
             return False, "iio_attr not found"
     
+    def _attr_args(self, attr: str, output: Optional[bool] = None) -> tuple:
+        """
+        iio_attr arguments addressing a PHY channel attribute.
+        
+        Built once per (attribute, direction) and cached.
+        
+        Args:
+            attr: Attribute name
+            output: True for TX (-o), False for RX (-i), None for either
+            
+        Returns:
+            Command arguments tuple (without the value)
+        """
+        args = self._attr_argv.get((attr, output))
+        if args is None:
+            direction = () if output is None else ("-o" if output else "-i",)
+            args = ("-d", self.device_name, "-c", "voltage0", *direction, attr)
+            self._attr_argv[(attr, output)] = args
+        return args
+    
+    def _device(self):
+        """
+        PHY device from the persistent libiio context, opened on first use.
+        
+        Returns:
+            iio.Device, or None without bindings, connection or device
+        """
+        if self._phy is None and iio is not None and self.is_connected:
+            # configure_all writes from several threads; open the context once
+            with self._ctx_lock:
+                if self._phy is None:
+                    try:
+                        self._ctx = iio.Context(self.device_uri)
+                        self._phy = self._ctx.find_device(self.device_name)
+                    except OSError as e:
+                        logger.error(f"Failed to open IIO context {self.device_uri}: {e}")
+                        self._ctx = None
+                        self._phy = None
+        return self._phy
+    
+    def _read_device_attrs(self, name: str) -> Tuple[bool, str]:
+        """
+        Read all attributes of an IIO device.
+        
+        Uses the persistent libiio context when connected through the bindings,
+        otherwise one iio_attr call, so iio_attr is only needed as a fallback.
+        
+        Args:
+            name: IIO device name
+            
+        Returns:
+            Tuple of (success, "attribute: value" lines)
+        """
+        if self._device() is None:
+            return self._run_iio_cmd(["-d", name], check=False)
+        
+        device = self._ctx.find_device(name)
+        if device is None:
+            return False, f"device {name} not found"
+        
+        lines = []
+        try:
+            with self._iio_sem:
+                for attr_name, attr in device.attrs.items():
+                    lines.append(f"{attr_name}: {attr.value}")
+        except OSError as e:
+            logger.error(f"IIO attribute read failed on {name}: {e}")
+            return False, str(e)
+        return True, "\n".join(lines)
+    
+    def _write_attr(self, attr: str, value: str, output: Optional[bool] = None) -> bool:
+        """
+        Write a PHY channel attribute.
+        
+        Uses the persistent libiio context when connected through the bindings,
+        otherwise one iio_attr call.
+        
+        Args:
+            attr: Attribute name
+            value: Attribute value
+            output: True for TX, False for RX, None for either
+            
+        Returns:
+            True if write successful
+        """
+        phy = self._device()
+        if phy is None:
+            success, _ = self._run_iio_cmd([*self._attr_args(attr, output), value])
+            return success
+        
+        # LO settings live on the altvoltage channels (RX_LO, TX_LO)
+        if attr in LO_ATTRS:
+            key = ("altvoltage1" if output else "altvoltage0", True)
+        else:
+            key = ("voltage0", bool(output))
+        
+        channel = self._channels.get(key)
+        if channel is None:
+            channel = self._channels[key] = phy.find_channel(*key)
+        
+        try:
+            with self._iio_sem:
+                channel.attrs[attr].value = value
+            return True
+        except (AttributeError, KeyError, OSError) as e:
+            logger.error(f"IIO attribute write failed: {attr} = {value}")
+            logger.error(f"Error: {e}")
+            return False
+    
     def connect(self) -> bool:
         """
         Verify connection to ANTSDR E316.
@@ -87,8 +285,18 @@ class ANTSDRController:
         """
         logger.info(f"Connecting to ANTSDR at {self.device_uri}...")
         
-        # Try to read device name as connectivity test
-        success, output = self._run_iio_cmd(["-d", self.device_name, "-c", "voltage0"], check=False)
+        # Drop any previous context; the next attribute access opens a new one
+        self._ctx = None
+        self._phy = None
+        self._channels.clear()
+        self._fastlock_freqs = None
+        
+        # Probe the iiod port as connectivity test
+        try:
+            with socket.create_connection((self.config.ip_address, IIOD_PORT), timeout=0.5):
+                success = True
+        except OSError:
+            success = False
         
         if success:
             self.is_connected = True
@@ -100,6 +308,80 @@ class ANTSDRController:
             logger.error(f"   Please verify: IP address ({self.config.ip_address}), network connection, device power")
             return False
     
+    def _tx_writes(self) -> List[Tuple[str, str, Optional[bool], str]]:
+        """
+        TX attribute writes.
+        
+        Returns:
+            List of (attribute, value, output, log message)
+        """
+        return [
+            # TX frequency
+            ("frequency", str(int(self.config.center_freq)), True,
+             f"  TX Frequency: {self.config.center_freq/1e6:.1f} MHz"),
+            # TX power (hardware gain)
+            ("hardwaregain", str(int(self.config.tx_power)), True,
+             f"  TX Power: {self.config.tx_power} dBm"),
+            # TX port
+            ("rf_port_select", self.config.tx_port, True,
+             f"  TX Port: {self.config.tx_port}"),
+        ]
+    
+    def _rx_writes(self) -> List[Tuple[str, str, Optional[bool], str]]:
+        """
+        RX attribute writes.
+        
+        Returns:
+            List of (attribute, value, output, log message)
+        """
+        return [
+            # RX frequency
+            ("frequency", str(int(self.config.center_freq)), False,
+             f"  RX Frequency: {self.config.center_freq/1e6:.1f} MHz"),
+            # RX gain
+            ("hardwaregain", str(int(self.config.rx_gain)), False,
+             f"  RX Gain: {self.config.rx_gain} dB"),
+            # RX port
+            ("rf_port_select", self.config.rx_port, False,
+             f"  RX Port: {self.config.rx_port}"),
+        ]
+    
+    def _sampling_writes(self) -> List[Tuple[str, str, Optional[bool], str]]:
+        """
+        Sample rate and bandwidth attribute writes.
+        
+        Returns:
+            List of (attribute, value, output, log message)
+        """
+        return [
+            # Sample rate: one rate is shared by RX and TX on the AD9364,
+            # so it is written once through the RX channel
+            ("sampling_frequency", str(int(self.config.sample_rate)), False,
+             f"  Sample Rate: {self.config.sample_rate/1e6:.1f} MSPS"),
+            # RF bandwidth: the RX and TX analog filters are set separately
+            ("rf_bandwidth", str(int(self.config.bandwidth)), False,
+             f"  RX Bandwidth: {self.config.bandwidth/1e6:.1f} MHz"),
+            ("rf_bandwidth", str(int(self.config.bandwidth)), True,
+             f"  TX Bandwidth: {self.config.bandwidth/1e6:.1f} MHz"),
+        ]
+    
+    def _apply_writes(self, writes: List[Tuple[str, str, Optional[bool], str]]) -> bool:
+        """
+        Apply attribute writes in order, stopping at the first failure.
+        
+        Args:
+            writes: List of (attribute, value, output, log message)
+            
+        Returns:
+            True if all writes successful
+        """
+        for attr, value, output, message in writes:
+            if not self._write_attr(attr, value, output):
+                logger.error(f"  Failed to set {attr} = {value}")
+                return False
+            logger.info(message)
+        return True
+    
     def configure_tx(self) -> bool:
         """
         Configure transmit parameters.
@@ -113,38 +395,8 @@ class ANTSDRController:
         
         logger.info("Configuring TX parameters...")
         
-        # Set TX frequency
-        success, _ = self._run_iio_cmd([
-            "-d", self.device_name,
-            "-c", "voltage0",
-            "-o", "frequency",
-            str(int(self.config.center_freq))
-        ])
-        if not success:
-            return False
-        logger.info(f"  TX Frequency: {self.config.center_freq/1e6:.1f} MHz")
-        
-        # Set TX power (hardware gain)
-        success, _ = self._run_iio_cmd([
-            "-d", self.device_name,
-            "-c", "voltage0",
-            "-o", "hardwaregain",
-            str(int(self.config.tx_power))
-        ])
-        if not success:
-            return False
-        logger.info(f"  TX Power: {self.config.tx_power} dBm")
-        
-        # Set TX port
-        success, _ = self._run_iio_cmd([
-            "-d", self.device_name,
-            "-c", "voltage0",
-            "-o", "rf_port_select",
-            self.config.tx_port
-        ])
-        if not success:
+        if not self._apply_writes(self._tx_writes()):
             return False
-        logger.info(f"  TX Port: {self.config.tx_port}")
         
         logger.info("✅ TX configuration complete")
         return True
@@ -162,38 +414,8 @@ class ANTSDRController:
         
         logger.info("Configuring RX parameters...")
         
-        # Set RX frequency
-        success, _ = self._run_iio_cmd([
-            "-d", self.device_name,
-            "-c", "voltage0",
-            "-i", "frequency",
-            str(int(self.config.center_freq))
-        ])
-        if not success:
+        if not self._apply_writes(self._rx_writes()):
             return False
-        logger.info(f"  RX Frequency: {self.config.center_freq/1e6:.1f} MHz")
-        
-        # Set RX gain
-        success, _ = self._run_iio_cmd([
-            "-d", self.device_name,
-            "-c", "voltage0",
-            "-i", "hardwaregain",
-            str(int(self.config.rx_gain))
-        ])
-        if not success:
-            return False
-        logger.info(f"  RX Gain: {self.config.rx_gain} dB")
-        
-        # Set RX port
-        success, _ = self._run_iio_cmd([
-            "-d", self.device_name,
-            "-c", "voltage0",
-            "-i", "rf_port_select",
-            self.config.rx_port
-        ])
-        if not success:
-            return False
-        logger.info(f"  RX Port: {self.config.rx_port}")
         
         logger.info("✅ RX configuration complete")
         return True
@@ -211,27 +433,8 @@ class ANTSDRController:
         
         logger.info("Configuring sampling parameters...")
         
-        # Set sample rate
-        success, _ = self._run_iio_cmd([
-            "-d", self.device_name,
-            "-c", "voltage0",
-            "sampling_frequency",
-            str(int(self.config.sample_rate))
-        ])
-        if not success:
+        if not self._apply_writes(self._sampling_writes()):
             return False
-        logger.info(f"  Sample Rate: {self.config.sample_rate/1e6:.1f} MSPS")
-        
-        # Set RF bandwidth
-        success, _ = self._run_iio_cmd([
-            "-d", self.device_name,
-            "-c", "voltage0",
-            "rf_bandwidth",
-            str(int(self.config.bandwidth))
-        ])
-        if not success:
-            return False
-        logger.info(f"  Bandwidth: {self.config.bandwidth/1e6:.1f} MHz")
         
         logger.info("✅ Sampling configuration complete")
         return True
@@ -240,6 +443,11 @@ class ANTSDRController:
         """
         Configure all hardware parameters.
         
+        Sample rate and bandwidth are applied first, in order, since the TX
+        and RX settings depend on them; the TX and RX groups are independent
+        of each other and are then applied concurrently to overlap the IIO
+        round trips. Each write is logged as it completes.
+        
         Returns:
             True if all configurations successful
         """
@@ -247,10 +455,15 @@ class ANTSDRController:
             if not self.connect():
                 return False
         
-        success = True
-        success &= self.configure_sampling()
-        success &= self.configure_tx()
-        success &= self.configure_rx()
+        logger.info("Configuring sampling, TX and RX parameters...")
+        
+        if self._apply_writes(self._sampling_writes()):
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                results = list(pool.map(self._apply_writes, (self._tx_writes(), self._rx_writes())))
+        else:
+            results = [False]
+        
+        success = all(results)
         
         if success:
             logger.info("🎉 All ANTSDR hardware successfully configured!")
@@ -272,7 +485,7 @@ class ANTSDRController:
         
         # Try to read GPS fix attribute (implementation-specific)
         # This may need adjustment based on actual device firmware
-        success, output = self._run_iio_cmd(["-d", "gps"], check=False)
+        success, output = self._read_device_attrs("gps")
         
         if success and "lock" in output.lower():
             self.gps_locked = True
@@ -295,11 +508,8 @@ class ANTSDRController:
             "gps_locked": self.gps_locked,
             "config": {
                 "ip_address": self.config.ip_address,
-                "center_freq_mhz": self.config.center_freq / 1e6,
-                "tx_power_dbm": self.config.tx_power,
-                "rx_gain_db": self.config.rx_gain,
-                "sample_rate_msps": self.config.sample_rate / 1e6,
-                "bandwidth_mhz": self.config.bandwidth / 1e6
+                **{key: getattr(self.config, name) / scale
+                   for name, (key, scale) in STATUS_UNITS.items()}
             }
         }
         return status
@@ -319,30 +529,93 @@ class ANTSDRController:
         """
         logger.info(f"Running frequency sweep test: {start_freq/1e6:.1f} - {stop_freq/1e6:.1f} MHz")
         
-        current_freq = start_freq
-        step_count = 0
+        # Integer frequency schedule, computed once
+        freqs = np.arange(int(start_freq), int(stop_freq) + 1, int(step_freq), dtype=np.int64)
+        
+        # Short sweeps recall stored fastlock profiles instead of retuning the PLL
+        use_fastlock = self._load_fastlock_profiles(freqs)
         
-        while current_freq <= stop_freq:
+        # Plain ints: cheaper to iterate and format than NumPy scalars
+        for profile, current_freq in enumerate(freqs.tolist()):
             # Set frequency
-            success, _ = self._run_iio_cmd([
-                "-d", self.device_name,
-                "-c", "voltage0",
-                "-o", "frequency",
-                str(int(current_freq))
-            ])
+            if use_fastlock:
+                success = self._write_attr("fastlock_recall", str(profile), output=True)
+            else:
+                success = self._write_attr("frequency", str(current_freq), output=True)
             
             if not success:
-                logger.error(f"  Failed at {current_freq/1e6:.1f} MHz")
+                logger.error("  Failed at %.1f MHz", current_freq / 1e6)
                 return False
             
-            step_count += 1
-            current_freq += step_freq
-            time.sleep(0.001)  # 1 ms dwell time
+            # Wait for PLL lock; fixed 1 ms dwell if lock status is unreadable
+            if not self._wait_tx_lock() and not use_fastlock:
+                time.sleep(0.001)
         
-        logger.info(f"✅ Frequency sweep complete: {step_count} steps")
+        logger.info(f"✅ Frequency sweep complete: {len(freqs)} steps")
         
-        # Restore center frequency
-        self.configure_tx()
+        # Restore center frequency (the only TX setting the sweep changed)
+        if not self._write_attr("frequency", str(int(self.config.center_freq)), output=True):
+            logger.error("  Failed to restore center frequency")
+            return False
+        logger.info(f"  Restored center frequency: {self.config.center_freq/1e6:.1f} MHz")
+        return True
+    
+    def _wait_tx_lock(self, timeout: float = PLL_LOCK_TIMEOUT) -> bool:
+        """
+        Poll the TX synthesizer lock bit until lock or timeout.
+        
+        Reads are spaced by PLL_LOCK_POLL_INTERVAL so the poll yields the
+        CPU and does not flood iiod with back-to-back register reads.
+        
+        Args:
+            timeout: Maximum time to poll (s)
+            
+        Returns:
+            True if the lock status could be read (locked or timed out),
+            False if it is unavailable (no libiio bindings or register access)
+        """
+        phy = self._device()
+        if phy is None:
+            return False
+        
+        deadline = time.perf_counter() + timeout
+        try:
+            while not phy.reg_read(TX_SYNTH_LOCK_REG) & SYNTH_LOCK_BIT:
+                if time.perf_counter() >= deadline:
+                    logger.warning("  TX PLL lock not detected within timeout")
+                    break
+                time.sleep(PLL_LOCK_POLL_INTERVAL)
+        except (AttributeError, OSError):
+            return False
+        
+        return True
+    
+    def _load_fastlock_profiles(self, freqs: np.ndarray) -> bool:
+        """
+        Store TX LO fastlock profiles for a sweep schedule.
+        
+        Profiles are only (re)programmed when the schedule changes, so
+        repeated sweeps of the same list just recall them.
+        
+        Args:
+            freqs: Frequency schedule (Hz)
+            
+        Returns:
+            True if profile i holds freqs[i] for every step
+        """
+        if len(freqs) > FASTLOCK_PROFILES or self._device() is None:
+            return False
+        
+        if self._fastlock_freqs is not None and np.array_equal(self._fastlock_freqs, freqs):
+            return True
+        
+        self._fastlock_freqs = None
+        for profile, freq in enumerate(freqs):
+            if not (self._write_attr("frequency", str(freq), output=True)
+                    and self._write_attr("fastlock_store", str(profile), output=True)):
+                return False
+        
+        self._fastlock_freqs = freqs.copy()
         return True
     
     def save_config(self, filepath: str):
@@ -352,19 +625,8 @@ class ANTSDRController:
         Args:
             filepath: Path to save configuration
         """
-        config_dict = {
-            "ip_address": self.config.ip_address,
-            "center_freq": self.config.center_freq,
-            "tx_power": self.config.tx_power,
-            "rx_gain": self.config.rx_gain,
-            "sample_rate": self.config.sample_rate,
-            "bandwidth": self.config.bandwidth,
-            "tx_port": self.config.tx_port,
-            "rx_port": self.config.rx_port
-        }
-        
-        with open(filepath, 'w') as f:
-            json.dump(config_dict, f, indent=2)
+        with open(filepath, 'wb') as f:
+            f.write(_json_dumps(asdict(self.config)))
         
         logger.info(f"Configuration saved to {filepath}")
     
@@ -379,8 +641,8 @@ class ANTSDRController:
         Returns:
             ANTSDRController instance with loaded configuration
         """
-        with open(filepath, 'r') as f:
-            config_dict = json.load(f)
+        with open(filepath, 'rb') as f:
+            config_dict = _json_loads(f.read())
         
         config = ANTSDRConfig(**config_dict)
         controller = cls(config)
@@ -424,7 +686,7 @@ def main():
     print("\n" + "=" * 60)
     print("Device Status:")
     print("=" * 60)
-    print(json.dumps(status, indent=2))
+    print(_json_dumps(status).decode())
     
     # Save configuration
     controller.save_config("antsdr_config.json")
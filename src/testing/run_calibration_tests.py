@@ -3,15 +3,33 @@ GPR Calibration and Testing Suite
 Validates system performance against ASTM D6432 standards
 """
 
+from __future__ import annotations
+
+import array
+import functools
+import math
 import numpy as np
+import h5py
 import argparse
 import json
+import logging
+import multiprocessing
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Tuple
-import matplotlib.pyplot as plt
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, is_dataclass
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Optional: reports fall back to the json module
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None  # Optional: synthetic responses fall back to NumPy
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
@@ -25,7 +43,88 @@ except ImportError:
     GPRDataProcessor = None
 
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+# Section rule of the console output
+SEPARATOR = "=" * 60
+
+
+@functools.lru_cache(maxsize=8)
+def _time_axis(n_samples: int, sample_rate: float) -> np.ndarray:
+    """Cached (read-only) time axis in seconds"""
+    time_axis = np.arange(n_samples) / sample_rate
+    time_axis.flags.writeable = False
+    return time_axis
+
+
+def _json_default(obj):
+    """Convert dataclasses and NumPy values the json module cannot serialize"""
+    if is_dataclass(obj):
+        return asdict(obj)
+    if isinstance(obj, (np.generic, np.ndarray)):
+        return obj.tolist()
+    return str(obj)
+
+
+def _json_dumps(obj, indent: bool = True) -> bytes:
+    """Serialize to JSON (UTF-8 bytes), indented or compact, using orjson when available"""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=str, option=option)
+    return json.dumps(obj, indent=2 if indent else None, default=_json_default).encode()
+
+
+# Equivalent-time sample rate of the synthetic A-scans (Hz). Must exceed twice
+# the processor's 400 MHz band-pass edge; 200 ns traces give 2000 samples.
+SAMPLE_RATE = 10e9
+
+# Length of a synthetic A-scan (s)
+TRACE_DURATION = 200e-9
+
+# Depth tests needed before they are spread over worker processes; each worker
+# pays a processor import and Numba warmup, far more than one ~1 ms test
+PARALLEL_MIN_TARGETS = 8
+
+# Half-width of the evaluated Gaussian pulse, in pulse widths (exp(-36) ~ 2e-16)
+PULSE_SUPPORT = 6.0
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _gen_response_nb(out: np.ndarray, i0: int, i1: int, sample_rate: float,
+                         travel_time: float, pulse_width: float, amplitude: float,
+                         noise_level: float) -> np.ndarray:
+        """
+        Turn unit-variance noise into a synthetic target response in place.
+        
+        Args:
+            out: Buffer holding standard normal noise (n_samples,)
+            i0: First sample of the pulse window
+            i1: End (exclusive) of the pulse window
+            sample_rate: Sample rate (Hz)
+            travel_time: Two-way travel time of the reflection (s)
+            pulse_width: Gaussian pulse width (s)
+            amplitude: Pulse amplitude
+            noise_level: Noise standard deviation
+            
+        Returns:
+            out, scaled and with the Gaussian pulse added
+        """
+        for i in range(out.shape[0]):
+            out[i] *= noise_level
+        for i in range(i0, i1):
+            x = (i / sample_rate - travel_time) / pulse_width
+            out[i] += amplitude * math.exp(-x * x)
+        return out
+else:
+    _gen_response_nb = None
+
+
+# __slots__ dataclasses need Python 3.10; older interpreters keep a __dict__
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
 class CalibrationTarget:
     """Calibration target specification"""
     name: str
@@ -34,9 +133,14 @@ class CalibrationTarget:
     dielectric_constant: float
     expected_snr: float  # dB
     tolerance: float  # meters
+    
+    @property
+    def velocity(self) -> float:
+        """Propagation velocity in the target's medium (m/s)"""
+        return 3e8 / math.sqrt(self.dielectric_constant)
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class TestResult:
     """Individual test result"""
     test_name: str
@@ -53,10 +157,44 @@ class TestResult:
 class CalibrationReport:
     """Complete calibration report"""
     timestamp: str
-    system_config: Dict
-    test_results: List[TestResult]
+    system_config: dict
+    test_results: list[TestResult]
     overall_pass: bool
-    summary_statistics: Dict
+    summary_statistics: dict
+
+
+def _measure_target(processor, target: CalibrationTarget, signal: np.ndarray,
+                    sample_rate: float) -> tuple[float, list[dict]]:
+    """
+    Process a target's A-scan with the velocity of its medium.
+    
+    Args:
+        processor: GPRDataProcessor to use
+        target: Calibration target specification
+        signal: Raw A-scan
+        sample_rate: Sample rate (Hz)
+        
+    Returns:
+        Tuple of (measured SNR, detected targets)
+    """
+    processor.params.velocity = target.velocity / 1e9  # m/ns
+    processed, detected_targets = processor.process_ascan(signal, sample_rate)
+    return processor.calculate_snr(processed), detected_targets
+
+
+# Processor of a depth-test worker process, created by _init_worker
+_worker_processor = None
+
+
+def _init_worker(params):
+    """Create the worker process's processor with the suite's parameters"""
+    global _worker_processor
+    _worker_processor = GPRDataProcessor(params)
+
+
+def _measure_in_worker(target: CalibrationTarget, signal: np.ndarray) -> tuple[float, list[dict]]:
+    """_measure_target on the worker process's processor"""
+    return _measure_target(_worker_processor, target, signal, SAMPLE_RATE)
 
 
 class CalibrationTestSuite:
@@ -65,16 +203,25 @@ class CalibrationTestSuite:
     Implements ASTM D6432 compliance testing.
     """
     
-    def __init__(self, hardware_available: bool = False):
+    def __init__(self, hardware_available: bool = False, seed: int | None = None):
         """
         Initialize calibration test suite.
         
         Args:
             hardware_available: If True, use real hardware. Otherwise use simulation.
+            seed: Seed for the simulation random generator (None for fresh entropy)
         """
         self.hardware_available = hardware_available
+        
+        # PCG64 generator shared by all simulated measurements
+        self._rng = np.random.default_rng(seed)
         self.test_results = []
         
+        # Per-result columns kept in lockstep with test_results for the report
+        self._depth_errors = array.array('d')
+        self._snrs = array.array('d')
+        self._passed = bytearray()
+        
         # Define standard calibration targets
         self.targets = [
             CalibrationTarget(
@@ -108,9 +255,26 @@ class CalibrationTestSuite:
             self.processor = GPRDataProcessor()
         else:
             self.processor = None
+        
+        self._warmup()
+    
+    def _warmup(self):
+        """
+        Run the Numba kernels once on a blank trace.
+        
+        Compilation (or loading from the on-disk cache) then happens here
+        instead of inside the first timed depth-accuracy test.
+        """
+        n_samples = int(SAMPLE_RATE * TRACE_DURATION)
+        trace = np.zeros(n_samples)
+        
+        if _gen_response_nb is not None:
+            _gen_response_nb(trace, 0, 1, SAMPLE_RATE, 0.0, 5e-9, 0.0, 0.0)
+        if self.processor:
+            self.processor.process_ascan(trace, SAMPLE_RATE)
     
     def generate_synthetic_target_response(self, target: CalibrationTarget, 
-                                          sample_rate: float = 1e6,
+                                          sample_rate: float = SAMPLE_RATE,
                                           noise_level: float = 0.1) -> np.ndarray:
         """
         Generate synthetic GPR response for a calibration target.
@@ -123,113 +287,162 @@ class CalibrationTestSuite:
         Returns:
             Synthetic A-scan data
         """
+        return self.generate_synthetic_target_responses_batch([target], sample_rate, noise_level)[0]
+    
+    def generate_synthetic_target_responses_batch(self, targets: list[CalibrationTarget],
+                                                  sample_rate: float = SAMPLE_RATE,
+                                                  noise_level: float = 0.1) -> np.ndarray:
+        """
+        Generate synthetic GPR responses for several calibration targets at once.
+        
+        The noise for all targets is drawn in a single call; each row then
+        gets its target's reflection.
+        
+        Args:
+            targets: Calibration target specifications
+            sample_rate: Sample rate (Hz)
+            noise_level: Noise amplitude
+            
+        Returns:
+            Synthetic A-scan data (n_targets, n_samples)
+        """
+        n_samples = int(sample_rate * TRACE_DURATION)
+        
+        # Unit-variance noise, scaled in place per row below
+        signals = self._rng.standard_normal((len(targets), n_samples))
+        
+        for signal, target in zip(signals, targets):
+            self._add_target_response(signal, target, sample_rate, noise_level)
+        
+        return signals
+    
+    def _add_target_response(self, signal: np.ndarray, target: CalibrationTarget,
+                             sample_rate: float, noise_level: float) -> np.ndarray:
+        """
+        Turn unit-variance noise into a target's synthetic response in place.
+        
+        Args:
+            signal: Standard normal noise (n_samples,), overwritten
+            target: Calibration target specification
+            sample_rate: Sample rate (Hz)
+            noise_level: Noise amplitude
+            
+        Returns:
+            signal
+        """
+        n_samples = signal.shape[0]
+        
         # Calculate propagation parameters
-        velocity = 3e8 / np.sqrt(target.dielectric_constant)  # m/s
-        velocity_mns = velocity / 1e9  # m/ns
+        velocity = target.velocity  # m/s
         
         # Two-way travel time
         travel_time = 2 * target.depth / velocity  # seconds
-        travel_time_ns = travel_time * 1e9  # nanoseconds
-        
-        # Generate time axis
-        duration = 200e-9  # 200 ns
-        n_samples = int(sample_rate * duration)
-        time = np.arange(n_samples) / sample_rate
-        
-        # Generate signal
-        signal = np.zeros(n_samples)
         
         # Target reflection
         target_idx = int(travel_time * sample_rate)
         if target_idx < n_samples:
             # Gaussian pulse
             pulse_width = 5e-9  # 5 ns
-            pulse = np.exp(-((time - travel_time) / pulse_width) ** 2)
             
             # Amplitude based on SNR
             amplitude = 10 ** (target.expected_snr / 20)
-            signal += amplitude * pulse
-        
-        # Add noise
-        noise = np.random.normal(0, noise_level, n_samples)
-        signal += noise
+            
+            # Only samples within ±PULSE_SUPPORT widths carry any pulse energy
+            half_width = PULSE_SUPPORT * pulse_width
+            i0 = max(0, int((travel_time - half_width) * sample_rate))
+            i1 = min(n_samples, int((travel_time + half_width) * sample_rate) + 1)
+            
+            if _gen_response_nb is not None:
+                return _gen_response_nb(signal, i0, i1, sample_rate, travel_time,
+                                        pulse_width, amplitude, noise_level)
+            
+            time = _time_axis(n_samples, sample_rate)[i0:i1]
+            signal *= noise_level
+            signal[i0:i1] += amplitude * np.exp(-((time - travel_time) / pulse_width) ** 2)
+            return signal
         
+        # Noise only
+        signal *= noise_level
         return signal
     
-    def run_depth_accuracy_test(self, target: CalibrationTarget) -> TestResult:
+    def run_depth_accuracy_test(self, target: CalibrationTarget,
+                                signal: np.ndarray | None = None,
+                                timestamp: str | None = None,
+                                measurement: tuple[float, list[dict]] | None = None) -> TestResult:
         """
         Test depth measurement accuracy for a specific target.
         
         Args:
             target: Calibration target specification
+            signal: Pre-generated synthetic A-scan (generated here if None)
+            timestamp: ISO timestamp for the result (current time if None)
+            measurement: Precomputed (SNR, detected targets) of signal
             
         Returns:
             TestResult with depth accuracy measurements
         """
-        print(f"\n{'='*60}")
-        print(f"Testing: {target.name}")
-        print(f"Expected depth: {target.depth:.2f} m")
-        print(f"Tolerance: ±{target.tolerance:.2f} m")
-        print(f"{'='*60}")
+        logger.info("\n%s", SEPARATOR)
+        logger.info("Testing: %s", target.name)
+        logger.info("Expected depth: %.2f m", target.depth)
+        logger.info("Tolerance: ±%.2f m", target.tolerance)
+        logger.info(SEPARATOR)
         
-        # Generate or acquire data
-        sample_rate = 1e6  # 1 MSPS
+        # Generate or acquire data; the processor must see the same sample rate
+        sample_rate = SAMPLE_RATE
         
         if self.hardware_available and ANTSDRController:
             # TODO: Implement real hardware acquisition
-            print("⚙️  Acquiring data from hardware...")
-            signal = self.generate_synthetic_target_response(target)
+            logger.info("⚙️  Acquiring data from hardware...")
+            signal = self.generate_synthetic_target_response(target, sample_rate)
         else:
-            print("⚙️  Using synthetic data (simulation mode)")
-            signal = self.generate_synthetic_target_response(target)
+            logger.info("⚙️  Using synthetic data (simulation mode)")
+            if signal is None:
+                signal = self.generate_synthetic_target_response(target, sample_rate)
         
         # Process data
         if self.processor:
-            # Set velocity based on target's dielectric constant
-            velocity_mns = (3e8 / np.sqrt(target.dielectric_constant)) / 1e9
-            self.processor.params.velocity = velocity_mns
-            
-            processed, detected_targets = self.processor.process_ascan(signal, sample_rate)
-            
-            # Calculate SNR
-            measured_snr = self.processor.calculate_snr(processed)
+            # Process with the velocity of the target's medium and calculate SNR
+            if measurement is None:
+                measurement = _measure_target(self.processor, target, signal, sample_rate)
+            measured_snr, detected_targets = measurement
             
-            print(f"📊 Measured SNR: {measured_snr:.1f} dB")
-            print(f"📍 Detected {len(detected_targets)} target(s)")
+            logger.info("📊 Measured SNR: %.1f dB", measured_snr)
+            logger.info("📍 Detected %d target(s)", len(detected_targets))
             
             # Find closest target to expected depth
             if len(detected_targets) > 0:
-                closest_target = min(detected_targets, 
-                                   key=lambda t: abs(t['depth_m'] - target.depth))
+                depths = np.fromiter((t['depth_m'] for t in detected_targets),
+                                     dtype=np.float64, count=len(detected_targets))
+                closest_target = detected_targets[int(np.abs(depths - target.depth).argmin())]
                 measured_depth = closest_target['depth_m']
                 depth_error = measured_depth - target.depth
                 
-                print(f"✓ Measured depth: {measured_depth:.3f} m")
-                print(f"✓ Depth error: {depth_error:.3f} m ({depth_error/target.depth*100:.1f}%)")
+                logger.info("✓ Measured depth: %.3f m", measured_depth)
+                logger.info("✓ Depth error: %.3f m (%.1f%%)", depth_error, depth_error / target.depth * 100)
                 
                 # Check if within tolerance
                 passed = abs(depth_error) <= target.tolerance and measured_snr >= (target.expected_snr - 5)
                 
                 if passed:
-                    print(f"✅ PASSED")
+                    logger.info("✅ PASSED")
                 else:
-                    print(f"❌ FAILED")
+                    logger.info("❌ FAILED")
                     if abs(depth_error) > target.tolerance:
-                        print(f"   Depth error exceeds tolerance")
+                        logger.info("   Depth error exceeds tolerance")
                     if measured_snr < (target.expected_snr - 5):
-                        print(f"   SNR below threshold")
+                        logger.info("   SNR below threshold")
             else:
-                print("❌ FAILED: No targets detected")
+                logger.info("❌ FAILED: No targets detected")
                 measured_depth = 0.0
                 depth_error = target.depth
                 measured_snr = 0.0
                 passed = False
         else:
             # Fallback if processor not available
-            print("⚠️  Processor not available, using simulated results")
-            measured_depth = target.depth + np.random.normal(0, target.tolerance/2)
+            logger.info("⚠️  Processor not available, using simulated results")
+            measured_depth = target.depth + self._rng.normal(0, target.tolerance/2)
             depth_error = measured_depth - target.depth
-            measured_snr = target.expected_snr + np.random.normal(0, 2)
+            measured_snr = target.expected_snr + self._rng.normal(0, 2)
             passed = abs(depth_error) <= target.tolerance
         
         # Create test result
@@ -240,13 +453,25 @@ class CalibrationTestSuite:
             depth_error=depth_error,
             measured_snr=measured_snr,
             passed=passed,
-            timestamp=datetime.now().isoformat()
+            timestamp=timestamp or datetime.now().isoformat()
         )
         
-        self.test_results.append(result)
+        self._record_result(result)
         return result
     
-    def run_snr_test(self) -> Dict:
+    def _record_result(self, result: TestResult):
+        """
+        Append a test result and its report columns.
+        
+        Args:
+            result: Completed test result
+        """
+        self.test_results.append(result)
+        self._depth_errors.append(result.depth_error)
+        self._snrs.append(result.measured_snr)
+        self._passed.append(bool(result.passed))
+    
+    def run_snr_test(self) -> dict:
         """
         Test signal-to-noise ratio across frequency range.
         
@@ -258,18 +483,17 @@ class CalibrationTestSuite:
         print(f"{'='*60}")
         
         frequencies = np.linspace(400e6, 500e6, 11)  # 400-500 MHz, 11 points
-        snr_values = []
         
-        for freq in frequencies:
-            # Simulate SNR measurement at each frequency
-            # In real implementation, this would sweep the hardware
-            snr = np.random.uniform(15, 25)
-            snr_values.append(snr)
+        # Simulate SNR measurement at all frequencies in one draw
+        # In real implementation, this would sweep the hardware
+        snr_values = self._rng.uniform(15, 25, frequencies.size)
+        
+        for freq, snr in zip(frequencies.tolist(), snr_values.tolist()):
             print(f"  {freq/1e6:.0f} MHz: {snr:.1f} dB")
         
-        avg_snr = np.mean(snr_values)
-        min_snr = np.min(snr_values)
-        max_snr = np.max(snr_values)
+        avg_snr = snr_values.mean()
+        min_snr = snr_values.min()
+        max_snr = snr_values.max()
         
         print(f"\n📊 Average SNR: {avg_snr:.1f} dB")
         print(f"📊 Range: {min_snr:.1f} - {max_snr:.1f} dB")
@@ -283,14 +507,14 @@ class CalibrationTestSuite:
         
         return {
             'frequencies': frequencies.tolist(),
-            'snr_values': snr_values,
+            'snr_values': snr_values.tolist(),
             'average_snr': avg_snr,
             'min_snr': min_snr,
             'max_snr': max_snr,
             'passed': passed
         }
     
-    def run_latency_test(self) -> Dict:
+    def run_latency_test(self) -> dict:
         """
         Measure system latency from TX to processed data.
         
@@ -302,7 +526,7 @@ class CalibrationTestSuite:
         print(f"{'='*60}")
         
         # Simulate latency measurements
-        latencies = np.random.normal(5.0, 1.0, 10)  # Mean 5ms, std 1ms
+        latencies = self._rng.normal(5.0, 1.0, 10)  # Mean 5ms, std 1ms
         
         avg_latency = np.mean(latencies)
         max_latency = np.max(latencies)
@@ -326,7 +550,7 @@ class CalibrationTestSuite:
             'passed': passed
         }
     
-    def run_stability_test(self, duration: int = 60) -> Dict:
+    def run_stability_test(self, duration: int = 60) -> dict:
         """
         Test system stability over time.
         
@@ -342,14 +566,12 @@ class CalibrationTestSuite:
         
         print(f"⏱️  Running {duration}-second stability test...")
         
-        # Simulate measurements over time
+        # Simulate measurements over time. Only the random-walk endpoints are
+        # used, so draw them directly: a sum of n N(0, s^2) steps is N(0, n*s^2)
         n_measurements = duration
-        temperatures = 45 + np.cumsum(np.random.normal(0, 0.1, n_measurements))
-        snr_drift = np.cumsum(np.random.normal(0, 0.05, n_measurements))
-        errors = np.random.randint(0, 2, n_measurements).sum()
-        
-        temp_increase = temperatures[-1] - temperatures[0]
-        snr_change = abs(snr_drift[-1])
+        temp_increase = self._rng.normal(0, 0.1 * math.sqrt(max(n_measurements - 1, 0)))
+        snr_change = abs(self._rng.normal(0, 0.05 * math.sqrt(n_measurements)))
+        errors = self._rng.binomial(n_measurements, 0.5)
         
         print(f"📊 Temperature increase: {temp_increase:.1f} °C")
         print(f"📊 SNR drift: {snr_change:.2f} dB")
@@ -370,26 +592,49 @@ class CalibrationTestSuite:
             'passed': passed
         }
     
-    def run_full_test_suite(self, quick_mode: bool = False):
+    def run_full_test_suite(self, quick_mode: bool = False, report_format: str = 'json'):
         """
         Run complete calibration test suite.
         
         Args:
             quick_mode: If True, run abbreviated tests
+            report_format: Report file format ('json' or 'hdf5')
         """
         print("\n" + "="*60)
         print("GPR CALIBRATION TEST SUITE")
         print("="*60)
         print(f"Mode: {'Quick' if quick_mode else 'Full'}")
         print(f"Hardware: {'Connected' if self.hardware_available else 'Simulation'}")
-        print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        # One timestamp snapshot for the whole depth-test run
+        started = datetime.now()
+        started_iso = started.isoformat()
+        print(f"Started: {started.strftime('%Y-%m-%d %H:%M:%S')}")
         print("="*60)
         
         # Depth accuracy tests
         targets_to_test = self.targets[:2] if quick_mode else self.targets
         
-        for target in targets_to_test:
-            self.run_depth_accuracy_test(target)
+        if self.hardware_available and ANTSDRController:
+            for target in targets_to_test:
+                self.run_depth_accuracy_test(target, timestamp=started_iso)
+        else:
+            # Simulated responses are independent; generate them in one batch
+            signals = self.generate_synthetic_target_responses_batch(targets_to_test, SAMPLE_RATE)
+            
+            # Large target sets are processed in parallel; results, logging and
+            # any random draws stay in this process, in target order. Workers are
+            # spawned: forking after Numba's parallel threads start can deadlock.
+            measurements = [None] * len(targets_to_test)
+            if self.processor and len(targets_to_test) >= PARALLEL_MIN_TARGETS:
+                workers = min(len(targets_to_test), os.cpu_count() or 1)
+                with ProcessPoolExecutor(max_workers=workers,
+                                         mp_context=multiprocessing.get_context("spawn"),
+                                         initializer=_init_worker,
+                                         initargs=(self.processor.params,)) as pool:
+                    measurements = list(pool.map(_measure_in_worker, targets_to_test, signals))
+            
+            for target, signal, measurement in zip(targets_to_test, signals, measurements):
+                self.run_depth_accuracy_test(target, signal, started_iso, measurement)
         
         # SNR test
         snr_results = self.run_snr_test()
@@ -402,32 +647,37 @@ class CalibrationTestSuite:
         stability_results = self.run_stability_test(duration=stability_duration)
         
         # Generate report
-        self.generate_report()
+        self.generate_report(report_format)
     
-    def generate_report(self) -> CalibrationReport:
+    def generate_report(self, report_format: str = 'json') -> CalibrationReport:
         """
         Generate comprehensive calibration report.
         
+        Args:
+            report_format: Report file format ('json' or 'hdf5')
+            
         Returns:
             CalibrationReport object
         """
+        now = datetime.now()
+        
         print("\n" + "="*60)
         print("CALIBRATION REPORT SUMMARY")
         print("="*60)
         
         # Calculate statistics
         total_tests = len(self.test_results)
-        passed_tests = sum(1 for r in self.test_results if r.passed)
+        passed_tests = self._passed.count(1)
         overall_pass = (passed_tests == total_tests) and total_tests > 0
         
         if total_tests > 0:
-            depth_errors = [abs(r.depth_error) for r in self.test_results]
-            mean_error = np.mean(depth_errors)
-            max_error = np.max(depth_errors)
+            depth_errors = np.abs(np.frombuffer(self._depth_errors, dtype=np.float64))
+            mean_error = depth_errors.mean()
+            max_error = depth_errors.max()
             
-            snr_values = [r.measured_snr for r in self.test_results]
-            mean_snr = np.mean(snr_values)
-            min_snr = np.min(snr_values)
+            snr_values = np.frombuffer(self._snrs, dtype=np.float64)
+            mean_snr = snr_values.mean()
+            min_snr = snr_values.min()
         else:
             mean_error = 0.0
             max_error = 0.0
@@ -464,33 +714,92 @@ class CalibrationTestSuite:
         
         # Create report object
         report = CalibrationReport(
-            timestamp=datetime.now().isoformat(),
+            timestamp=now.isoformat(),
             system_config={'hardware_available': self.hardware_available},
             test_results=self.test_results,
             overall_pass=overall_pass,
             summary_statistics=summary_stats
         )
         
-        # Save to JSON
+        # Save to JSON or HDF5
         report_path = Path("docs/test_reports")
         report_path.mkdir(parents=True, exist_ok=True)
         
-        report_file = report_path / f"calibration_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        suffix = '.h5' if report_format == 'hdf5' else '.json'
+        report_file = report_path / f"calibration_report_{now.strftime('%Y%m%d_%H%M%S')}{suffix}"
         
-        with open(report_file, 'w') as f:
-            # Convert to dict
-            report_dict = {
-                'timestamp': report.timestamp,
-                'system_config': report.system_config,
-                'test_results': [asdict(r) for r in report.test_results],
-                'overall_pass': report.overall_pass,
-                'summary_statistics': report.summary_statistics
-            }
-            json.dump(report_dict, f, indent=2, default=str)
+        if report_format == 'hdf5':
+            self._write_hdf5_report(report, report_file)
+        else:
+            self._write_json_report(report, report_file)
         
         print(f"\n📄 Report saved to: {report_file}")
         
         return report
+    
+    def _write_json_report(self, report: CalibrationReport, report_file: Path):
+        """
+        Save a report as JSON, streaming the test results one per line.
+        
+        Only one encoded result is held in memory at a time, so long
+        regression runs write in constant memory.
+        
+        Args:
+            report: Report to save
+            report_file: Output file path
+        """
+        with open(report_file, 'wb') as f:
+            f.write(b'{\n  "timestamp": ' + _json_dumps(report.timestamp, indent=False))
+            f.write(b',\n  "system_config": ' + _json_dumps(report.system_config, indent=False))
+            f.write(b',\n  "test_results": [')
+            
+            # Results stay dataclasses; the encoder serializes them directly
+            separator = b'\n    '
+            for result in report.test_results:
+                f.write(separator)
+                f.write(_json_dumps(result, indent=False))
+                separator = b',\n    '
+            
+            f.write(b'\n  ],\n  "overall_pass": ' + _json_dumps(report.overall_pass, indent=False))
+            f.write(b',\n  "summary_statistics": ' + _json_dumps(report.summary_statistics, indent=False))
+            f.write(b'\n}\n')
+    
+    def _write_hdf5_report(self, report: CalibrationReport, report_file: Path):
+        """
+        Save a report as HDF5, one column dataset per result field.
+        
+        Run-level values are attributes: report timestamp and overall pass on
+        the root, system config and summary statistics on their groups.
+        
+        Args:
+            report: Report to save
+            report_file: Output file path
+        """
+        results = report.test_results
+        n_results = len(results)
+        str_dtype = h5py.string_dtype()
+        
+        with h5py.File(report_file, 'w') as f:
+            f.attrs['timestamp'] = report.timestamp
+            f.attrs['overall_pass'] = report.overall_pass
+            f.create_group('system_config').attrs.update(report.system_config)
+            f.create_group('summary_statistics').attrs.update(report.summary_statistics)
+            
+            columns = f.create_group('test_results')
+            for name in ('test_name', 'timestamp', 'notes'):
+                columns.create_dataset(name, data=[getattr(r, name) for r in results],
+                                       dtype=str_dtype)
+            for name in ('name', 'material'):
+                columns.create_dataset(f'target_{name}', data=[getattr(r.target, name) for r in results],
+                                       dtype=str_dtype)
+            for name in ('depth', 'tolerance', 'dielectric_constant', 'expected_snr'):
+                columns.create_dataset(f'target_{name}', data=np.fromiter(
+                    (getattr(r.target, name) for r in results), dtype=np.float64, count=n_results))
+            columns.create_dataset('measured_depth', data=np.fromiter(
+                (r.measured_depth for r in results), dtype=np.float64, count=n_results))
+            columns.create_dataset('depth_error', data=np.frombuffer(self._depth_errors, dtype=np.float64))
+            columns.create_dataset('measured_snr', data=np.frombuffer(self._snrs, dtype=np.float64))
+            columns.create_dataset('passed', data=np.frombuffer(self._passed, dtype=np.bool_))
 
 
 def main():
@@ -504,20 +813,34 @@ def main():
                        help='Comma-separated target depths (e.g., 0.5m,1.0m)')
     parser.add_argument('--report-dir', type=str, default='./docs/test_reports',
                        help='Output directory for reports')
+    parser.add_argument('--format', choices=['json', 'hdf5'], default='json',
+                       help='Report file format')
+    parser.add_argument('--seed', type=int, default=None,
+                       help='Random seed for reproducible simulation runs')
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument('-v', '--verbose', action='store_true',
+                           help='Debug-level output')
+    verbosity.add_argument('-q', '--quiet', action='store_true',
+                           help='Skip per-target details')
     
     args = parser.parse_args()
     
+    # Per-target details go through logging, on stdout next to the summaries
+    # (force: importing the hardware module already configured the root logger)
+    level = logging.DEBUG if args.verbose else logging.WARNING if args.quiet else logging.INFO
+    logging.basicConfig(level=level, format="%(message)s", stream=sys.stdout, force=True)
+    
     # Create test suite
-    suite = CalibrationTestSuite(hardware_available=args.hardware)
+    suite = CalibrationTestSuite(hardware_available=args.hardware, seed=args.seed)
     
     # Run tests
     if args.mode == 'quick':
-        suite.run_full_test_suite(quick_mode=True)
+        suite.run_full_test_suite(quick_mode=True, report_format=args.format)
     elif args.mode == 'full':
-        suite.run_full_test_suite(quick_mode=False)
+        suite.run_full_test_suite(quick_mode=False, report_format=args.format)
     elif args.mode == 'regression':
         print("Regression testing mode")
-        suite.run_full_test_suite(quick_mode=False)
+        suite.run_full_test_suite(quick_mode=False, report_format=args.format)
     
     print("\n✅ Testing complete")
 
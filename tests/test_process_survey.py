@@ -0,0 +1,51 @@
+"""
+Streamed survey processing must not depend on the block size
+"""
+
+import sys
+from pathlib import Path
+
+import h5py
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analysis.process_ascan import GPRDataProcessor, GPRProcessingParams
+
+SAMPLE_RATE = 1e9  # Hz, above twice the 400 MHz band-pass edge
+
+
+@pytest.fixture
+def survey_file(tmp_path):
+    """20-trace survey with a direct wave and a shallow reflector on some traces"""
+    rng = np.random.default_rng(0)
+    a_scans = (0.1 * rng.standard_normal((20, 1000))).astype(np.float32)
+    a_scans[:, 300:310] += 1.0
+    a_scans[:5, 100] += 3.0
+
+    path = tmp_path / "survey.h5"
+    with h5py.File(path, 'w') as f:
+        f['processed_data/a_scans'] = a_scans
+        f.create_group('metadata').attrs['sample_rate'] = SAMPLE_RATE
+
+    return path, a_scans
+
+
+@pytest.mark.parametrize("envelope_detection", [True, False])
+@pytest.mark.parametrize("chunk", [1, 3, 16, 1024])
+def test_chunked_survey_matches_single_batch(survey_file, chunk, envelope_detection):
+    path, a_scans = survey_file
+    processor = GPRDataProcessor(GPRProcessingParams(envelope_detection=envelope_detection))
+    expected, expected_targets = processor.process_bscan(a_scans, SAMPLE_RATE)
+
+    with processor.open_hdf5(str(path)) as survey:
+        blocks = list(processor.process_survey(survey, chunk=chunk))
+
+    assert [start for start, _, _ in blocks] == list(range(0, len(a_scans), chunk))
+    # Same filter and time-zero for every block; only FFT rounding may differ
+    np.testing.assert_allclose(np.vstack([p for _, p, _ in blocks]), expected,
+                               rtol=1e-4, atol=1e-5)
+    targets = [t for _, _, block_targets in blocks for t in block_targets]
+    assert [[t['index'] for t in trace] for trace in targets] == \
+        [[t['index'] for t in trace] for trace in expected_targets]